@@ -1,13 +1,57 @@
-from fastapi import FastAPI
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from fastapi import FastAPI, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any
 
 from jd_analyzer import analyze_job_description
 from question_generator import generate_interview_plan
-from evaluator import evaluate_answer
+from evaluator import evaluate_answer, evaluate_answer_async, evaluate_answers_batch
 from report_generator import generate_candidate_report
+from llm_client import warm_up, warm_up_async
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+app = FastAPI(default_response_class=ORJSONResponse)
+# Plans, evaluations and reports are multi-KB nested JSON; compress them on the wire
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# The LLM helpers are blocking; run them on a dedicated pool so the event loop
+# can keep many requests in flight while waiting on Gemini.
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "32"))
+llm_executor = ThreadPoolExecutor(max_workers=LLM_CONCURRENCY)
+
+# Cap concurrent Gemini calls issued by batch endpoints (provider rate limits).
+LLM_MAX_INFLIGHT = int(os.getenv("LLM_MAX_INFLIGHT", "16"))
+llm_semaphore = asyncio.Semaphore(LLM_MAX_INFLIGHT)
+
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Run a blocking LLM helper on the shared executor and await its result.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(llm_executor, partial(func, *args, **kwargs))
+
+
+# ---------- Response caching for deterministic-input routes ----------
+CACHE_CONTROL = "private, max-age=3600"
+
+
+def body_etag(payload: str) -> str:
+    return '"' + hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest() + '"'
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    return etag in request.headers.get("if-none-match", "")
 
 
 class JDRequest(BaseModel):
@@ -26,26 +70,79 @@ class EvaluateRequest(BaseModel):
     role_title: str | None = None
 
 
+class AnswerItem(BaseModel):
+    question: str
+    answer_transcript: str
+    answer_duration_seconds: float | None = None
+    filler_word_count: int | None = None
+
+
+class EvaluateRoundRequest(BaseModel):
+    role_title: str | None = None
+    items: List[AnswerItem]
+
+
 class ReportRequest(BaseModel):
     role_title: str
     evaluations: List[Dict[str, Any]]
 
 
+async def warm_up_pools():
+    try:
+        await asyncio.gather(run_blocking(warm_up), warm_up_async())
+    except Exception:
+        # Not fatal (requests open their own connections), but a missing key,
+        # bad model name or unreachable API should be visible in the logs
+        logger.warning("Gemini warm-up failed", exc_info=True)
+
+
+# Strong reference to the background warm-up task (asyncio only keeps weak ones)
+warm_up_tasks = set()
+
+
+@app.on_event("startup")
+async def warm_up_llm():
+    # Pre-open the sync and async Gemini connection pools so the first user
+    # request doesn't pay connection setup. Runs in the background: a slow or
+    # unreachable Gemini must not hold up startup.
+    task = asyncio.create_task(warm_up_pools())
+    warm_up_tasks.add(task)
+    task.add_done_callback(warm_up_tasks.discard)
+
+
+@app.on_event("shutdown")
+def shutdown_executor():
+    llm_executor.shutdown(wait=False)
+
+
 @app.post("/analyze_jd")
-def api_analyze_jd(body: JDRequest):
-    jd_info = analyze_job_description(body.jd_text)
-    return jd_info
+async def api_analyze_jd(body: JDRequest, request: Request):
+    etag = body_etag(body.jd_text)
+    if not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    # Repeat requests that miss the client's ETag are served by call_gemini_json's response cache
+    jd_info = await run_blocking(analyze_job_description, body.jd_text)
+    return ORJSONResponse(jd_info, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
 
 
 @app.post("/generate_plan")
-def api_generate_plan(body: PlanRequest):
-    plan = generate_interview_plan(body.jd_info)
-    return plan
+async def api_generate_plan(body: PlanRequest, request: Request):
+    jd_info_json = json.dumps(body.jd_info, sort_keys=True)
+    etag = body_etag(jd_info_json)
+    if not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    plan = await run_blocking(generate_interview_plan, body.jd_info)
+    return ORJSONResponse(plan, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
 
 
 @app.post("/evaluate_answer")
-def api_evaluate_answer(body: EvaluateRequest):
-    result = evaluate_answer(
+async def api_evaluate_answer(body: EvaluateRequest):
+    # Re-submitting the same answer (page refresh, client retry) is served by
+    # call_gemini_json's exact-prompt response cache
+    result = await run_blocking(
+        evaluate_answer,
         question=body.question,
         answer_transcript=body.answer_transcript,
         answer_duration_seconds=body.answer_duration_seconds,
@@ -55,9 +152,37 @@ def api_evaluate_answer(body: EvaluateRequest):
     return result
 
 
+@app.post("/evaluate_answers")
+async def api_evaluate_answers(body: List[EvaluateRequest]):
+    async def evaluate_one(item: EvaluateRequest):
+        async with llm_semaphore:
+            return await evaluate_answer_async(
+                question=item.question,
+                answer_transcript=item.answer_transcript,
+                answer_duration_seconds=item.answer_duration_seconds,
+                filler_word_count=item.filler_word_count,
+                role_title=item.role_title,
+            )
+
+    # Results come back in the same order as the request items
+    results = await asyncio.gather(*[evaluate_one(item) for item in body])
+    return results
+
+
+@app.post("/evaluate_round")
+async def api_evaluate_round(body: EvaluateRoundRequest):
+    results = await run_blocking(
+        evaluate_answers_batch,
+        items=[item.model_dump() for item in body.items],
+        role_title=body.role_title,
+    )
+    return results
+
+
 @app.post("/generate_report")
-def api_generate_report(body: ReportRequest):
-    report = generate_candidate_report(
+async def api_generate_report(body: ReportRequest):
+    report = await run_blocking(
+        generate_candidate_report,
         role_title=body.role_title,
         evaluations=body.evaluations,
     )
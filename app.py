@@ -1,21 +1,23 @@
 # app.py
+import hashlib
+import html as html_lib
 import json
+from collections import namedtuple
+from copy import copy
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import io
+import math
+import os
+import time
 import wave
 
-import numpy as np
-import pandas as pd
 import streamlit as st
+import streamlit.components.v1 as components
 
-from file_utils import extract_text_from_pdf
-from resume_matcher import analyze_resume, match_resume_to_jd
-from jd_analyzer import analyze_job_description
-from question_generator import generate_interview_plan, build_rounds
-from evaluator import evaluate_answer
-from report_generator import generate_candidate_report, generate_candidate_feedback
-from audio_stt import transcribe_audio_bytes
-from streamlit_mic_recorder import mic_recorder
+# Stage-specific modules (analysis, evaluation, reports, audio, numpy)
+# are imported inside the functions that use them, so each rerun only loads
+# what the active stage needs.
 
 # ---------- Streamlit Page Config ----------
 st.set_page_config(
@@ -26,87 +28,121 @@ st.set_page_config(
 
 
 # ---------- Helper: make the agent speak the question ----------
-def speak_text(text: str, key: str):
-    """
-    Use browser's SpeechSynthesis to speak the question.
-
-    - Tries to auto-speak once per question (may be blocked by autoplay rules).
-    - Always renders a 🔊 button that the user can click to play/replay the question.
-    """
-    # Decide whether to try auto-speak this rerun
-    spoken_flag_key = f"spoken_{key}"
-    auto_speak = False
-    if not st.session_state.get(spoken_flag_key):
-        st.session_state[spoken_flag_key] = True
-        auto_speak = True  # first time for this question
+# Static script + markup: the question text travels only as an escaped
+# data-text attribute, so no per-question JS identifiers are generated.
+SPEECH_HTML_TEMPLATE = """
+        <style>
+        #speak-btn {
+            border-radius: 999px;
+            border: 1px solid #38bdf8;
+            padding: 4px 12px;
+            background: rgba(15,23,42,0.9);
+            color: #e5e7eb;
+            font-size: 0.8rem;
+            cursor: pointer;
+        }
+        </style>
 
-    escaped = json.dumps(text)
-    # Make sure the JS function name is a valid identifier
-    safe_key = key.replace("-", "_").replace(" ", "_")
+        <div style="margin: 0.5rem 0 0.8rem 0;">
+            <button id="speak-btn" type="button" data-text="__TEXT__" data-auto="__AUTO__">
+                🔊 Play question again
+            </button>
+        </div>
 
-    st.markdown(
-        f"""
         <script>
-        const questionText_{safe_key} = {escaped};
+        const btn = document.getElementById("speak-btn");
 
-        function speakQuestion_{safe_key}() {{
-            if (!("speechSynthesis" in window)) {{
+        function speakQuestion(event) {
+            if (!("speechSynthesis" in window)) {
                 alert("Speech synthesis is not supported in this browser.");
                 return;
-            }}
-            const msg = new SpeechSynthesisUtterance(questionText_{safe_key});
+            }
+            const msg = new SpeechSynthesisUtterance(btn.dataset.text);
             msg.rate = 1;
             msg.pitch = 1;
             window.speechSynthesis.cancel();
             window.speechSynthesis.speak(msg);
-        }}
+        }
+
+        btn.addEventListener("click", speakQuestion);
 
         // Try auto-speak only once per question (may be blocked by browser)
-        if ({str(auto_speak).lower()}) {{
+        if (btn.dataset.auto === "true") {
             // small delay so page finishes rendering
-            setTimeout(speakQuestion_{safe_key}, 300);
-        }}
+            setTimeout(speakQuestion, 300);
+        }
         </script>
+        """
 
-        <div style="margin: 0.5rem 0 0.8rem 0;">
-            <button
-                type="button"
-                onclick="speakQuestion_{safe_key}()"
-                style="
-                    border-radius: 999px;
-                    border: 1px solid #38bdf8;
-                    padding: 4px 12px;
-                    background: rgba(15,23,42,0.9);
-                    color: #e5e7eb;
-                    font-size: 0.8rem;
-                    cursor: pointer;
-                "
-            >
-                🔊 Play question again
-            </button>
-        </div>
-        """,
-        unsafe_allow_html=True,
+
+def build_speech_html(text: str, auto_speak: bool) -> str:
+    return (
+        SPEECH_HTML_TEMPLATE
+        .replace("__AUTO__", "true" if auto_speak else "false")
+        .replace("__TEXT__", html_lib.escape(text, quote=True))
     )
 
 
+def speak_text(text: str, key: str):
+    """
+    Use browser's SpeechSynthesis to speak the question.
+
+    - Tries to auto-speak once per question (may be blocked by autoplay rules).
+    - Always renders a 🔊 button that the user can click to play/replay the question.
+
+    The HTML is built once per question and kept in session state; reruns
+    re-emit the stored payload instead of re-escaping the text.
+    """
+    html_key = f"speech_html_{key}"
+    cached = st.session_state.get(html_key)
+
+    if cached is not None and cached[0] == text:
+        html = cached[1]
+    else:
+        # First render of this question: auto-speak, then store the replay-only version
+        html = build_speech_html(text, auto_speak=True)
+        st.session_state[html_key] = (text, build_speech_html(text, auto_speak=False))
+
+    # Rendered in a component iframe so the script actually runs
+    components.html(html, height=56)
+
 
 # ---------- Voice level helper ----------
+VOICE_LEVEL_BLOCK_FRAMES = 8192
+
+
 def compute_voice_level(audio_bytes: bytes) -> float:
     """
     Compute a simple voice 'intensity' level (0.0 - 1.0) from WAV audio bytes.
     This is based on RMS amplitude, not true pitch.
     """
+    import numpy as np
+
     try:
         with wave.open(io.BytesIO(audio_bytes)) as wf:
-            frames = wf.readframes(wf.getnframes())
-            if not frames:
+            remaining = wf.getnframes()
+            if remaining == 0:
                 return 0.0
-            # Assuming 16-bit PCM
-            audio_array = np.frombuffer(frames, dtype=np.int16)
-            if audio_array.size == 0:
+            frame_size = wf.getnchannels() * wf.getsampwidth()
+
+            # Read in fixed-size blocks so peak memory stays O(block), not O(recording)
+            sumsq = 0.0
+            n_samples = 0
+            while remaining > 0:
+                chunk = wf.readframes(min(VOICE_LEVEL_BLOCK_FRAMES, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk) // frame_size
+
+                # Assuming 16-bit PCM
+                # float32 + dot product: no float64 copy and no temporary squared array
+                samples = np.frombuffer(chunk, dtype=np.int16).astype(np.float32)
+                sumsq += float(np.dot(samples, samples))
+                n_samples += samples.size
+
+            if n_samples == 0:
                 return 0.0
-            rms = np.sqrt(np.mean(audio_array.astype(np.float64) ** 2))
+            rms = math.sqrt(sumsq / n_samples)
             norm_level = min(rms / 32768.0, 1.0)
             return float(norm_level)
     except Exception:
@@ -114,75 +150,227 @@ def compute_voice_level(audio_bytes: bytes) -> float:
 
 
 # ---------- Dynamic round threshold based on experience ----------
-def get_round_pass_threshold() -> float:
+# First matching keyword wins; 6.0 if nothing matches
+_THRESHOLD_TABLE = (
+    ("fresher", 5.0),
+    ("intern", 5.0),
+    ("junior", 6.0),
+    ("mid", 7.0),
+    ("senior", 8.0),
+)
+DEFAULT_ROUND_PASS_THRESHOLD = 6.0
+
+
+def get_round_pass_threshold(profile: dict) -> float:
     """
     Decide how strict the round pass threshold should be
     based on candidate experience level.
+    Called once when the profile is captured; the result is kept in
+    st.session_state.round_pass_threshold.
     """
-    profile = st.session_state.get("profile") or {}
-    exp = (profile.get("experience") or "").lower()
-
-    if "fresher" in exp or "intern" in exp:
-        return 5.0
-    elif "junior" in exp:
-        return 6.0
-    elif "mid" in exp:
-        return 7.0
-    elif "senior" in exp:
-        return 8.0
-    else:
-        # default if unknown
-        return 6.0
+    exp = ((profile or {}).get("experience") or "").lower()
+    return next(
+        (v for k, v in _THRESHOLD_TABLE if k in exp),
+        DEFAULT_ROUND_PASS_THRESHOLD,
+    )
 
 
-# ---------- Session State Initialization ----------
-if "stage" not in st.session_state:
-    # stages: onboarding -> analysis -> interview -> results
-    st.session_state.stage = "onboarding"
+# ---------- Resume text extraction (memoised per PDF) ----------
+def pdf_cache_key(pdf_bytes: bytes) -> str:
+    return hashlib.blake2b(pdf_bytes, digest_size=16).hexdigest()
+
+
+def get_resume_text(pdf_bytes: bytes):
+    """
+    Extract resume text once per unique PDF.
+    Results live in st.session_state.pdf_text_cache, which is kept across
+    "Restart" so going back and resubmitting the same file skips parsing.
+    """
+    from file_utils import extract_text_from_pdf
+
+    pdf_hash = pdf_cache_key(pdf_bytes)
+    cache = st.session_state.pdf_text_cache
+    if pdf_hash not in cache:
+        cache[pdf_hash] = extract_text_from_pdf(pdf_bytes)
+    return cache[pdf_hash]
+
+
+def load_resume(uploaded_file):
+    """
+    Read the uploaded resume and extract its text under a spinner.
+    The extracted text is stored in the PDF cache so run_analysis reuses it.
+    Returns the PDF bytes (empty if nothing was uploaded).
+    """
+    # getvalue() returns the upload buffer directly and, unlike read(),
+    # does not depend on the file cursor
+    pdf_bytes = uploaded_file.getvalue()
+    if pdf_bytes:
+        with st.spinner("Reading your resume..."):
+            get_resume_text(pdf_bytes)
+    return pdf_bytes
+
+
+# ---------- Per-question widget keys ----------
+QuestionKeys = namedtuple(
+    "QuestionKeys", "speak voice_level mic transcript stt_job answer_form answer_box"
+)
 
-if "profile" not in st.session_state:
-    st.session_state.profile = None  # {name, company, role, experience_level, email}
 
-if "resume_bytes" not in st.session_state:
-    st.session_state.resume_bytes = None
+def build_question_keys(rounds) -> list:
+    """
+    Build the widget/session keys for every question once, right after the
+    rounds are planned. Indexed as round_keys[round_idx][q_idx].
+    """
+    return [
+        [
+            QuestionKeys(
+                speak=f"round{r}_q{q}",
+                voice_level=f"voice_level_{r}_{q}",
+                mic=f"mic_{r}_{q}",
+                transcript=f"transcript_{r}_{q}",
+                stt_job=f"stt_job_{r}_{q}",
+                answer_form=f"answer_form_{r}_{q}",
+                answer_box=f"answer_box_{r}_{q}",
+            )
+            for q in range(len(rnd.questions))
+        ]
+        for r, rnd in enumerate(rounds)
+    ]
 
-if "jd_text" not in st.session_state:
-    st.session_state.jd_text = ""
 
-if "resume_info" not in st.session_state:
-    st.session_state.resume_info = None
+# ---------- Background transcription ----------
+@st.cache_resource
+def get_stt_executor() -> ThreadPoolExecutor:
+    """
+    Shared worker pool for speech-to-text jobs.
+    Cached as a resource so it survives Streamlit reruns.
+    """
+    return ThreadPoolExecutor(max_workers=4)
 
-if "jd_info" not in st.session_state:
-    st.session_state.jd_info = None
 
-if "match_report" not in st.session_state:
-    st.session_state.match_report = None
+# ---------- Deferred (batched) evaluation ----------
+# Minimum seconds between redraws of streamed LLM output
+STREAM_REDRAW_INTERVAL = 0.1
 
-if "plan" not in st.session_state:
-    st.session_state.plan = None
 
-if "rounds" not in st.session_state:
-    # List of { key, name, questions }
-    st.session_state.rounds = []
+def collect_pending_evaluations() -> bool:
+    """
+    Score all queued answers with one batched LLM call and move them into
+    st.session_state.evaluations, preserving submission order.
+    Returns False (answers stay queued for a retry) if the evaluation fails.
+    """
+    pending = st.session_state.pending_evals
+    if not pending:
+        return True
 
-if "current_round_index" not in st.session_state:
-    st.session_state.current_round_index = 0  # which round candidate is on
+    from evaluator import evaluate_answers_batch
 
-if "question_index_in_round" not in st.session_state:
-    st.session_state.question_index_in_round = 0  # which question within the round
+    jd_info = st.session_state.jd_info or {}
 
-if "evaluations" not in st.session_state:
-    # List of { "round_key", "round_name", "question", "answer", "evaluation", "timestamp" }
-    st.session_state.evaluations = []
+    # Stream the evaluator output so the candidate sees progress immediately.
+    # Redraws are throttled: chunks arrive faster than the browser needs updates.
+    live_output = st.empty()
+    streamed = []
+    last_redraw = [0.0]
 
-if "interview_finished" not in st.session_state:
-    st.session_state.interview_finished = False
+    def show_chunk(text: str):
+        streamed.append(text)
+        now = time.monotonic()
+        if now - last_redraw[0] >= STREAM_REDRAW_INTERVAL:
+            last_redraw[0] = now
+            live_output.code("".join(streamed), language="json")
+
+    try:
+        results = evaluate_answers_batch(
+            [
+                {"question": item["question"], "answer_transcript": item["answer"]}
+                for item in pending
+            ],
+            role_title=jd_info.get("role_title"),
+            on_chunk=show_chunk,
+        )
+    except Exception as e:
+        # Keep the answers queued: a transient API error must not fail the round
+        st.error(f"Error while evaluating your answers: {e}")
+        return False
+    finally:
+        live_output.empty()
+
+    for item, result in zip(pending, results):
+        # Extract the headline score once, so later consumers don't walk the raw evaluation
+        scores = result.get("scores") if isinstance(result, dict) else None
+        score = (scores or {}).get("overall_impression")
+
+        item["evaluation"] = result
+        item["overall_score"] = score
+        st.session_state.evaluations.append(item)
+
+        # Keep per-round overall scores up to date for the pass/fail check
+        if score is not None:
+            st.session_state.round_scores.setdefault(item["round_key"], []).append(score)
+
+    st.session_state.pending_evals = []
+    return True
 
-if "candidate_started" not in st.session_state:
-    st.session_state.candidate_started = False
 
-if "high_contrast" not in st.session_state:
-    st.session_state.high_contrast = True
+# ---------- Cached report generation ----------
+# Results re-render on every rerun (expander toggles, sidebar); cache the LLM
+# reports on their inputs. Evaluations are passed as sorted JSON so they hash.
+def evaluations_cache_key(evaluations) -> str:
+    return json.dumps(evaluations, sort_keys=True, default=str)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def cached_interview_reports(role_title: str, evaluations_json: str):
+    """
+    Candidate feedback + HR report, generated concurrently in one go.
+    Returns { "candidate_feedback", "hr_report" }.
+    """
+    from report_generator import generate_interview_reports
+
+    return generate_interview_reports(
+        role_title=role_title,
+        evaluations=json.loads(evaluations_json),
+    )
+
+
+# ---------- Session State Initialization ----------
+SESSION_DEFAULTS = {
+    # stages: onboarding -> analysis -> interview -> results
+    "stage": "onboarding",
+    "profile": None,  # {name, company, role, experience_level, email}
+    "round_pass_threshold": DEFAULT_ROUND_PASS_THRESHOLD,
+    "resume_bytes": None,
+    "jd_text": "",
+    "resume_info": None,
+    "jd_info": None,
+    "match_report": None,
+    "plan": None,
+    # List of question_generator.Round(key, name, questions)
+    "rounds": [],
+    # [[QuestionKeys, ...], ...] built alongside rounds
+    "round_keys": [],
+    "current_round_index": 0,  # which round candidate is on
+    "question_index_in_round": 0,  # which question within the round
+    # List of { "round_key", "round_name", "question", "answer", "evaluation", "overall_score", "timestamp" }
+    "evaluations": [],
+    # Submitted answers awaiting the end-of-round batch evaluation
+    "pending_evals": [],
+    # { round_key: [overall_impression, ...] }
+    "round_scores": {},
+    "interview_finished": False,
+    # ("success" | "error", message) explaining why the interview ended, shown on results
+    "round_outcome": None,
+    "candidate_started": False,
+    "candidate_feedback": None,
+    # { blake2b(pdf_bytes): extracted text }
+    "pdf_text_cache": {},
+    "high_contrast": True,
+}
+
+for _key, _default in SESSION_DEFAULTS.items():
+    # copy() so list/dict defaults are never shared between sessions
+    st.session_state.setdefault(_key, copy(_default))
 
 
 # ---------- Reset helper ----------
@@ -190,6 +378,7 @@ def reset_everything():
     keys_to_reset = [
         "stage",
         "profile",
+        "round_pass_threshold",
         "resume_bytes",
         "jd_text",
         "resume_info",
@@ -197,11 +386,16 @@ def reset_everything():
         "match_report",
         "plan",
         "rounds",
+        "round_keys",
         "current_round_index",
         "question_index_in_round",
         "evaluations",
+        "pending_evals",
+        "round_scores",
         "interview_finished",
+        "round_outcome",
         "candidate_started",
+        "candidate_feedback",
     ]
     for k in keys_to_reset:
         if k in st.session_state:
@@ -213,19 +407,27 @@ def reset_everything():
 st.sidebar.title("📋 Interview Controls")
 
 stage_to_step = {"onboarding": 1, "analysis": 2, "interview": 3, "results": 4}
-current_step = stage_to_step.get(st.session_state.stage, 1)
-progress_ratio = current_step / 4.0
 
-st.sidebar.markdown("#### Flow Progress")
-st.sidebar.progress(progress_ratio)
-st.sidebar.markdown(
-    f"""
+# Own slot so goto() can redraw the progress when it switches stage mid-run
+flow_progress_slot = st.sidebar.empty()
+
+
+def render_flow_progress(stage: str):
+    current_step = stage_to_step.get(stage, 1)
+    with flow_progress_slot.container():
+        st.markdown("#### Flow Progress")
+        st.progress(current_step / 4.0)
+        st.markdown(
+            f"""
 - **1. Candidate details** {'✅' if current_step > 1 else '⬤'}
 - **2. Analysis & setup** {'✅' if current_step > 2 else '⬤'}
 - **3. Voice interview** {'✅' if current_step > 3 else '⬤'}
 - **4. Results & feedback** {'✅' if current_step > 4 else '⬤'}
 """
-)
+        )
+
+
+render_flow_progress(st.session_state.stage)
 
 st.sidebar.markdown("---")
 st.sidebar.markdown("### Display")
@@ -250,192 +452,236 @@ st.sidebar.caption(
 
 
 # ---------- Global styling (uses high-contrast toggle) ----------
-main_text_color = "#e5e7eb" if st.session_state.high_contrast else "#9ca3af"
-heading_color = "#f9fafb" if st.session_state.high_contrast else "#e5e7eb"
-secondary_text = "#cbd5f5" if st.session_state.high_contrast else "#9ca3af"
-
-st.markdown(
-    f"""
-    <style>
-    /* Overall app background */
-    .stApp {{
-        background: radial-gradient(circle at top left, #020617 0, #020617 40%, #000 100%);
-        color: {main_text_color} !important;
-    }}
-
-    /* Main container width tweak */
-    .block-container {{
-        padding-top: 1.5rem;
-        padding-bottom: 2rem;
-        max-width: 1100px;
-    }}
-
-    /* Typography */
-    h1, h2, h3, h4 {{
-        font-family: system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif;
-        color: {heading_color} !important;
-    }}
-
-    body, .stApp, p, li {{
-        color: {main_text_color} !important;
-    }}
-
-    small, .stCaption, label {{
-        color: {secondary_text} !important;
-    }}
-
-    /* Glass cards */
-    .glass-card {{
-        background: rgba(15, 23, 42, 0.82);
-        border-radius: 18px;
-        padding: 1.25rem 1.5rem;
-        border: 1px solid rgba(148, 163, 184, 0.35);
-        box-shadow: 0 18px 40px rgba(15, 23, 42, 0.9);
-    }}
-
-    .section-label {{
-        font-size: 0.8rem;
-        letter-spacing: 0.08em;
-        text-transform: uppercase;
-        color: {secondary_text} !important;
-        font-weight: 600;
-        margin-bottom: 0.25rem;
-    }}
-
-    .tag-pill {{
-        display: inline-flex;
-        align-items: center;
-        gap: 0.35rem;
-        padding: 0.15rem 0.6rem;
-        border-radius: 999px;
-        font-size: 0.7rem;
-        background: rgba(15,23,42,0.9);
-        border: 1px solid rgba(148,163,184,0.55);
-        color: {main_text_color};
-    }}
-
-    .pill-dot {{
-        width: 6px;
-        height: 6px;
-        border-radius: 999px;
-        background: #22c55e;
-    }}
-
-    /* Buttons */
-    .stButton>button {{
-        border-radius: 999px;
-        padding: 0.45rem 1.3rem;
-        font-weight: 600;
-        border: 1px solid rgba(148,163,184,0.5);
-        background: radial-gradient(circle at top left, #1d4ed8, #4f46e5);
-        color: white;
-    }}
-    .stButton>button:hover {{
-        filter: brightness(1.08);
-        border-color: #93c5fd;
-    }}
-
-    /* Sidebar */
-    section[data-testid="stSidebar"] {{
-        background: linear-gradient(180deg, #020617 0%, #020617 50%, #020617 100%);
-        border-right: 1px solid rgba(148, 163, 184, 0.35);
-    }}
-
-    section[data-testid="stSidebar"] * {{
-        color: {main_text_color} !important;
-    }}
-
-    /* Metric labels */
-    [data-testid="stMetricLabel"] {{
-        color: {secondary_text} !important;
-    }}
-    [data-testid="stMetricValue"] {{
-        color: #ffffff !important;
-    }}
-
-    /* Mic recorder button styling */
-    .mic-wrapper button {{
-        border-radius: 999px !important;
-        padding: 0.4rem 1.3rem !important;
-        font-weight: 600 !important;
-        border: 1px solid rgba(34,197,94,0.95) !important;
-        background: radial-gradient(circle at top left, #22c55e, #16a34a) !important;
-        color: #f9fafb !important;
-        cursor: pointer !important;
-        transition: transform 0.08s ease-out, box-shadow 0.08s ease-out, filter 0.08s !important;
-        box-shadow: 0 10px 25px rgba(22,163,74,0.45) !important;
-    }}
-
-    .mic-wrapper button:hover {{
-        filter: brightness(1.06) !important;
-        transform: translateY(-1px) !important;
-        box-shadow: 0 14px 30px rgba(22,163,74,0.55) !important;
-    }}
-
-    .mic-wrapper button:active {{
-        transform: translateY(0px) scale(0.99) !important;
-        box-shadow: 0 8px 20px rgba(22,163,74,0.45) !important;
-    }}
-
-    /* Entrance animations */
-    @keyframes fadeInUp {{
-        from {{
-            opacity: 0;
-            transform: translateY(8px);
+@st.cache_data(show_spinner=False)
+def build_global_css(high_contrast: bool) -> str:
+    """
+    Build the global stylesheet once per high-contrast setting (at most two entries).
+    """
+    main_text_color = "#e5e7eb" if high_contrast else "#9ca3af"
+    heading_color = "#f9fafb" if high_contrast else "#e5e7eb"
+    secondary_text = "#cbd5f5" if high_contrast else "#9ca3af"
+
+    return f"""
+        <style>
+        /* Overall app background */
+        .stApp {{
+            background: radial-gradient(circle at top left, #020617 0, #020617 40%, #000 100%);
+            color: {main_text_color} !important;
         }}
-        to {{
-            opacity: 1;
-            transform: translateY(0);
+
+        /* Main container width tweak */
+        .block-container {{
+            padding-top: 1.5rem;
+            padding-bottom: 2rem;
+            max-width: 1100px;
         }}
-    }}
 
-    .fade-in {{
-        animation: fadeInUp 0.45s ease-out;
-    }}
+        /* Typography */
+        h1, h2, h3, h4 {{
+            font-family: system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif;
+            color: {heading_color} !important;
+        }}
 
-    .fade-in-delayed {{
-        animation: fadeInUp 0.6s ease-out;
-    }}
+        body, .stApp, p, li {{
+            color: {main_text_color} !important;
+        }}
 
-    @media (prefers-reduced-motion: reduce) {{
-        .fade-in, .fade-in-delayed {{
-            animation: none !important;
+        small, .stCaption, label {{
+            color: {secondary_text} !important;
+        }}
+
+        /* Glass cards */
+        .glass-card {{
+            background: rgba(15, 23, 42, 0.82);
+            border-radius: 18px;
+            padding: 1.25rem 1.5rem;
+            border: 1px solid rgba(148, 163, 184, 0.35);
+            box-shadow: 0 18px 40px rgba(15, 23, 42, 0.9);
         }}
-    }}
-
-    /* Improve readability inside cards */
-    .glass-card * {{
-        color: {main_text_color} !important;
-    }}
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
+
+        .section-label {{
+            font-size: 0.8rem;
+            letter-spacing: 0.08em;
+            text-transform: uppercase;
+            color: {secondary_text} !important;
+            font-weight: 600;
+            margin-bottom: 0.25rem;
+        }}
+
+        .tag-pill {{
+            display: inline-flex;
+            align-items: center;
+            gap: 0.35rem;
+            padding: 0.15rem 0.6rem;
+            border-radius: 999px;
+            font-size: 0.7rem;
+            background: rgba(15,23,42,0.9);
+            border: 1px solid rgba(148,163,184,0.55);
+            color: {main_text_color};
+        }}
+
+        .pill-dot {{
+            width: 6px;
+            height: 6px;
+            border-radius: 999px;
+            background: #22c55e;
+        }}
+
+        /* Buttons */
+        .stButton>button {{
+            border-radius: 999px;
+            padding: 0.45rem 1.3rem;
+            font-weight: 600;
+            border: 1px solid rgba(148,163,184,0.5);
+            background: radial-gradient(circle at top left, #1d4ed8, #4f46e5);
+            color: white;
+        }}
+        .stButton>button:hover {{
+            filter: brightness(1.08);
+            border-color: #93c5fd;
+        }}
+
+        /* Sidebar */
+        section[data-testid="stSidebar"] {{
+            background: linear-gradient(180deg, #020617 0%, #020617 50%, #020617 100%);
+            border-right: 1px solid rgba(148, 163, 184, 0.35);
+        }}
+
+        section[data-testid="stSidebar"] * {{
+            color: {main_text_color} !important;
+        }}
+
+        /* Metric labels */
+        [data-testid="stMetricLabel"] {{
+            color: {secondary_text} !important;
+        }}
+        [data-testid="stMetricValue"] {{
+            color: #ffffff !important;
+        }}
+
+        /* Mic recorder button styling */
+        .mic-wrapper button {{
+            border-radius: 999px !important;
+            padding: 0.4rem 1.3rem !important;
+            font-weight: 600 !important;
+            border: 1px solid rgba(34,197,94,0.95) !important;
+            background: radial-gradient(circle at top left, #22c55e, #16a34a) !important;
+            color: #f9fafb !important;
+            cursor: pointer !important;
+            transition: transform 0.08s ease-out, box-shadow 0.08s ease-out, filter 0.08s !important;
+            box-shadow: 0 10px 25px rgba(22,163,74,0.45) !important;
+        }}
+
+        .mic-wrapper button:hover {{
+            filter: brightness(1.06) !important;
+            transform: translateY(-1px) !important;
+            box-shadow: 0 14px 30px rgba(22,163,74,0.55) !important;
+        }}
+
+        .mic-wrapper button:active {{
+            transform: translateY(0px) scale(0.99) !important;
+            box-shadow: 0 8px 20px rgba(22,163,74,0.45) !important;
+        }}
+
+        /* Entrance animations */
+        @keyframes fadeInUp {{
+            from {{
+                opacity: 0;
+                transform: translateY(8px);
+            }}
+            to {{
+                opacity: 1;
+                transform: translateY(0);
+            }}
+        }}
+
+        .fade-in {{
+            animation: fadeInUp 0.45s ease-out;
+        }}
+
+        .fade-in-delayed {{
+            animation: fadeInUp 0.6s ease-out;
+        }}
+
+        @media (prefers-reduced-motion: reduce) {{
+            .fade-in, .fade-in-delayed {{
+                animation: none !important;
+            }}
+        }}
+
+        /* Improve readability inside cards */
+        .glass-card * {{
+            color: {main_text_color} !important;
+        }}
+        </style>
+        """
+
+
+st.markdown(build_global_css(st.session_state.high_contrast), unsafe_allow_html=True)
+
+
+# ---------- Static stage headers ----------
+ONBOARDING_HERO_HTML = """
+<div class="glass-card fade-in">
+    <div class="section-label">AI Voice Interview Agent</div>
+    <h1 style="margin-bottom:0.3rem;">Practice job interviews, end-to-end.</h1>
+    <p style="max-width:680px; margin-top:0.35rem; font-size:0.95rem;">
+        Upload your resume, paste a real job description, and experience an AI-driven, voice-based interview.
+        At the end, you receive a structured HR-style summary and concrete skill feedback.
+    </p>
+    <div style="display:flex; gap:0.5rem; flex-wrap:wrap; margin-top:0.9rem;">
+        <span class="tag-pill"><span class="pill-dot"></span>Resume–JD matching</span>
+        <span class="tag-pill"><span class="pill-dot"></span>Dynamic multi-round flow</span>
+        <span class="tag-pill"><span class="pill-dot"></span>Voice-only Q&A</span>
+    </div>
+</div>
+"""
+
+ANALYSIS_HERO_HTML = """
+<div class="glass-card fade-in">
+    <div class="section-label">Step 2</div>
+    <h2 style="margin-bottom:0.25rem;">Analysing profile & generating rounds</h2>
+    <p style="margin-top:0;">
+        The agent is reading your resume, understanding the job description, and assembling realistic interview rounds.
+    </p>
+</div>
+"""
+
+INTERVIEW_HERO_HTML = """
+<div class="glass-card fade-in">
+    <div class="section-label">Step 3</div>
+    <h2 style="margin-bottom:0.25rem;">Voice interview in progress</h2>
+    <p style="margin-top:0;">
+        The agent will read each question aloud. Respond using your microphone, then review and refine the transcript before submitting.
+    </p>
+</div>
+"""
+
+RESULTS_HERO_HTML = """
+<div class="glass-card fade-in">
+    <div class="section-label">Step 4</div>
+    <h2 style="margin-bottom:0.25rem;">Interview results & personalised feedback</h2>
+    <p style="margin-top:0;">
+        Below is a consolidated view of your performance, including strengths, improvement areas,
+        and an HR-style recommendation.
+    </p>
+</div>
+"""
 
 
 # ======================================================================
 #                           STAGE 1: ONBOARDING
 # ======================================================================
+CHECKLIST_MD = "\n".join(
+    f"- ✅ {label}"
+    for label in ("Quiet environment", "Stable internet connection", "Working microphone")
+)
+
+SHOW_DEBUG_PANEL = os.getenv("SHOW_DEBUG_PANEL") == "1"
+
+
 def render_onboarding():
-    # Hero header
-    st.markdown(
-        """
-        <div class="glass-card fade-in">
-            <div class="section-label">AI Voice Interview Agent</div>
-            <h1 style="margin-bottom:0.3rem;">Practice job interviews, end-to-end.</h1>
-            <p style="max-width:680px; margin-top:0.35rem; font-size:0.95rem;">
-                Upload your resume, paste a real job description, and experience an AI-driven, voice-based interview.
-                At the end, you receive a structured HR-style summary and concrete skill feedback.
-            </p>
-            <div style="display:flex; gap:0.5rem; flex-wrap:wrap; margin-top:0.9rem;">
-                <span class="tag-pill"><span class="pill-dot"></span>Resume–JD matching</span>
-                <span class="tag-pill"><span class="pill-dot"></span>Dynamic multi-round flow</span>
-                <span class="tag-pill"><span class="pill-dot"></span>Voice-only Q&A</span>
-            </div>
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+    st.markdown(ONBOARDING_HERO_HTML, unsafe_allow_html=True)
 
     st.markdown("")
     col_left, col_right = st.columns([2, 1])
@@ -444,47 +690,50 @@ def render_onboarding():
         st.markdown('<div class="section-label">Step 1</div>', unsafe_allow_html=True)
         st.subheader("Candidate details")
 
-        col1, col2 = st.columns(2)
-        with col1:
-            name = st.text_input("Full name", key="name", placeholder="Alex Johnson")
-            email = st.text_input("Email (optional)", key="email", placeholder="alex@email.com")
-            company = st.text_input("Target company", key="company", placeholder="Acme Corp")
-        with col2:
-            role = st.text_input("Role applying for", key="role", placeholder="Backend Engineer")
-            experience = st.selectbox(
-                "Experience level",
-                ["Fresher", "Junior", "Mid", "Senior"],
-                key="experience",
-            )
+        # Inputs live in a form so typing doesn't rerun the script per keystroke;
+        # values are sent together when the form is submitted.
+        with st.form("onboarding_form", clear_on_submit=False, border=False):
+            col1, col2 = st.columns(2)
+            with col1:
+                name = st.text_input("Full name", key="name", placeholder="Alex Johnson")
+                email = st.text_input("Email (optional)", key="email", placeholder="alex@email.com")
+                company = st.text_input("Target company", key="company", placeholder="Acme Corp")
+            with col2:
+                role = st.text_input("Role applying for", key="role", placeholder="Backend Engineer")
+                experience = st.selectbox(
+                    "Experience level",
+                    ["Fresher", "Junior", "Mid", "Senior"],
+                    key="experience",
+                )
 
-        st.markdown("")
-        st.markdown('<div class="section-label">Step 2</div>', unsafe_allow_html=True)
-        st.subheader("Resume & job description")
+            st.markdown("")
+            st.markdown('<div class="section-label">Step 2</div>', unsafe_allow_html=True)
+            st.subheader("Resume & job description")
 
-        resume_file = st.file_uploader(
-            "Upload your resume (PDF)",
-            type=["pdf"],
-            key="resume_file",
-        )
+            resume_file = st.file_uploader(
+                "Upload your resume (PDF)",
+                type=["pdf"],
+                key="resume_file",
+            )
 
-        jd_text = st.text_area(
-            "Paste the job description (JD)",
-            height=220,
-            placeholder="Paste the full job description you want to practise for...",
-            key="jd_text_input",
-        )
+            jd_text = st.text_area(
+                "Paste the job description (JD)",
+                height=220,
+                placeholder="Paste the full job description you want to practise for...",
+                key="jd_text_input",
+            )
 
-        st.markdown(
-            "<small>Files are processed in-memory only for this demo session.</small>",
-            unsafe_allow_html=True,
-        )
+            st.markdown(
+                "<small>Files are processed in-memory only for this demo session.</small>",
+                unsafe_allow_html=True,
+            )
 
-        st.markdown("")
-        c1, c2 = st.columns([1, 3])
-        with c1:
-            start_clicked = st.button("▶ Start interview setup")
-        with c2:
-            st.caption("We will first analyse your resume and the JD to design a tailored interview plan.")
+            st.markdown("")
+            c1, c2 = st.columns([1, 3])
+            with c1:
+                start_clicked = st.form_submit_button("▶ Start interview setup")
+            with c2:
+                st.caption("We will first analyse your resume and the JD to design a tailored interview plan.")
 
         if start_clicked:
             missing = []
@@ -504,8 +753,8 @@ def render_onboarding():
                 st.error("Please complete the following before continuing: " + ", ".join(missing))
                 return
 
-            # ✅ SAFELY STORE FILE ONCE
-            resume_bytes = resume_file.read()
+            # ✅ SAFELY STORE FILE ONCE (read + cached text extraction, under a spinner)
+            resume_bytes = load_resume(resume_file)
             if not resume_bytes:
                 st.error("The uploaded resume appears to be empty. Please upload a valid PDF.")
                 return
@@ -518,13 +767,15 @@ def render_onboarding():
                 "role": role,
                 "experience": experience,
             }
+            st.session_state.round_pass_threshold = get_round_pass_threshold(
+                st.session_state.profile
+            )
 
             st.session_state.resume_bytes = resume_bytes
             st.session_state.jd_text = jd_text
 
-            st.success("Resume and job description captured successfully.")
-            st.session_state.stage = "analysis"
-            st.rerun()
+            goto("analysis")
+            return
 
     with col_right:
         st.markdown('<div class="glass-card fade-in-delayed">', unsafe_allow_html=True)
@@ -539,16 +790,12 @@ def render_onboarding():
         )
         st.markdown("---")
         st.markdown("#### Quick checklist")
-        checklist_items = [
-            ("Quiet environment", True),
-            ("Stable internet connection", True),
-            ("Working microphone", True),
-        ]
-        for label, _ in checklist_items:
-            st.markdown(f"- ✅ {label}")
+        st.markdown(CHECKLIST_MD)
         st.markdown("</div>", unsafe_allow_html=True)
 
-    # Developer debug info (kept but tucked away)
+    # Developer debug info (only when SHOW_DEBUG_PANEL=1)
+    if not SHOW_DEBUG_PANEL:
+        return
     with st.expander("Debug information (development only)"):
         st.write({
             "name": bool(st.session_state.get("name")),
@@ -564,23 +811,15 @@ def render_onboarding():
 #                           STAGE 2: ANALYSIS
 # ======================================================================
 def run_analysis():
-    st.markdown(
-        """
-        <div class="glass-card fade-in">
-            <div class="section-label">Step 2</div>
-            <h2 style="margin-bottom:0.25rem;">Analysing profile & generating rounds</h2>
-            <p style="margin-top:0;">
-                The agent is reading your resume, understanding the job description, and assembling realistic interview rounds.
-            </p>
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+    from cache_utils import cached_analyze_jd_and_plan, cached_analyze_resume_and_match
+    from question_generator import build_rounds
+
+    st.markdown(ANALYSIS_HERO_HTML, unsafe_allow_html=True)
 
     st.markdown("")
     with st.spinner("Running resume and JD analysis..."):
         # Extract resume text
-        resume_text = extract_text_from_pdf(st.session_state.resume_bytes)
+        resume_text = get_resume_text(st.session_state.resume_bytes)
         if not resume_text:
             st.error(
                 "We could not extract text from your resume. "
@@ -591,13 +830,19 @@ def run_analysis():
                 st.rerun()
             return
 
-        # Analyze resume & JD
-        resume_info = analyze_resume(resume_text)
-        jd_info = analyze_job_description(st.session_state.jd_text)
-        match_report = match_resume_to_jd(jd_info, resume_info)
-
-        # Build interview plan & dynamic rounds based on JD (realistic company-style flow)
-        plan = generate_interview_plan(jd_info)
+        # Two fused LLM calls, run concurrently and cached by content hash:
+        # - JD analysis + interview plan (realistic company-style rounds)
+        # - resume analysis + resume/JD match
+        jd_text = st.session_state.jd_text
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            f_resume = ex.submit(cached_analyze_resume_and_match, resume_text, jd_text)
+            f_jd = ex.submit(cached_analyze_jd_and_plan, jd_text)
+            resume_result, jd_result = f_resume.result(), f_jd.result()
+
+        resume_info = resume_result["resume_info"]
+        match_report = resume_result["match_report"]
+        jd_info = jd_result["jd_info"]
+        plan = jd_result["plan"]
         rounds = build_rounds(jd_info, plan)
 
         if not rounds:
@@ -616,25 +861,216 @@ def run_analysis():
         st.session_state.match_report = match_report
         st.session_state.plan = plan
         st.session_state.rounds = rounds
+        st.session_state.round_keys = build_question_keys(rounds)
 
         # Reset interview state
         st.session_state.current_round_index = 0
         st.session_state.question_index_in_round = 0
         st.session_state.evaluations = []
+        st.session_state.pending_evals = []
+        st.session_state.round_scores = {}
+        st.session_state.candidate_feedback = None
         st.session_state.interview_finished = False
         st.session_state.candidate_started = False
 
-    st.success("Interview rounds are ready. You can now begin the voice interview.")
-    st.session_state.stage = "interview"
-    st.rerun()
+    goto("interview")
+
+
+# ---------- Question fragment (voice Q&A for one question) ----------
+def submit_answer(round_key: str, round_name: str, question: str, answer_key: str):
+    """
+    on_click callback for the submit button: queue the answer and advance.
+    Runs before the fragment rerun the click triggers, so the next render
+    already shows the next question without an extra st.rerun().
+    """
+    final_answer = st.session_state.get(answer_key, "").strip()
+    if not final_answer:
+        st.session_state.submit_error = True
+        return
+
+    # Queue the answer; the whole round is evaluated in one call at the end
+    st.session_state.pending_evals.append(
+        {
+            "round_key": round_key,
+            "round_name": round_name,
+            "question": question,
+            "answer": final_answer,
+            "evaluation": None,
+            "timestamp": datetime.now().isoformat(),
+        }
+    )
+
+    # Provisional confirmation; the answer is scored at the round boundary
+    st.toast("Answer recorded. It will be scored at the end of this round.")
+
+    st.session_state.question_index_in_round += 1
+
+
+def start_interview():
+    """
+    on_click callback for "Start voice interview".
+    """
+    st.session_state.candidate_started = True
+    st.session_state.interview_finished = False
+    st.session_state.current_round_index = 0
+    st.session_state.question_index_in_round = 0
+    st.session_state.evaluations = []
+    st.session_state.pending_evals = []
+    st.session_state.round_scores = {}
+    st.session_state.candidate_feedback = None
+
+
+@st.fragment
+def render_question(round_idx: int, round_key: str, round_name: str, questions):
+    """
+    Render the current question, mic recorder, transcript review and submit button.
+
+    Runs as a fragment, so recording, editing and moving to the next question
+    only rerun this block instead of the whole app.
+    """
+    from audio_stt import cached_transcribe
+    from streamlit_mic_recorder import mic_recorder
+
+    total_q_in_round = len(questions)
+    q_idx = st.session_state.question_index_in_round
+    if q_idx >= total_q_in_round:
+        # Last answer of the round was just submitted: full rerun so
+        # render_interview decides pass/fail
+        st.rerun()
+    current_question = questions[q_idx]
+    keys = st.session_state.round_keys[round_idx][q_idx]
+
+    top_col_1, top_col_2 = st.columns([3, 1])
+    with top_col_1:
+        st.markdown(
+            f"#### {round_name} · Question {q_idx + 1} of {total_q_in_round}"
+        )
+    with top_col_2:
+        round_progress = (q_idx) / float(total_q_in_round)
+        st.progress(round_progress)
+
+    st.markdown(
+        f"""
+        <div class="glass-card fade-in" style="margin-top:0.5rem;">
+            <div class="section-label">Question</div>
+            <p style="font-size:1.02rem; margin-bottom:0;">{current_question}</p>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+
+    # Make agent speak the question
+    speak_text(
+        current_question,
+        key=keys.speak,
+    )
+
+    st.write("🎙️ Click to start recording your answer, then click again to stop:")
+
+    col_mic, col_level = st.columns([1, 2])
+
+    voice_level_key = keys.voice_level
+    if voice_level_key not in st.session_state:
+        st.session_state[voice_level_key] = 0.0
+
+    with col_mic:
+        st.markdown('<div class="mic-wrapper">', unsafe_allow_html=True)
+        audio = mic_recorder(
+            start_prompt="Start recording",
+            stop_prompt="Stop recording",
+            key=keys.mic,
+        )
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    with col_level:
+        st.markdown("##### Voice level (last answer)")
+        st.progress(st.session_state[voice_level_key])
+
+    # Keep transcript in session
+    transcript_key = keys.transcript
+    if transcript_key not in st.session_state:
+        st.session_state[transcript_key] = ""
+
+    # Transcribe in the background: { "hash", "future", "applied" } per question.
+    # The mic component returns the same payload on later reruns, so only a
+    # new recording (new hash) starts a new job.
+    stt_key = keys.stt_job
+    if audio and audio.get("bytes"):
+        audio_bytes = audio["bytes"]
+        audio_hash = hashlib.sha256(audio_bytes).hexdigest()
+        job = st.session_state.get(stt_key)
+        if job is None or job["hash"] != audio_hash:
+            # Compute voice level (0–1) from audio
+            st.session_state[voice_level_key] = compute_voice_level(audio_bytes)
+            st.session_state[stt_key] = {
+                "hash": audio_hash,
+                "future": get_stt_executor().submit(cached_transcribe, audio_hash, audio_bytes),
+                "applied": False,
+            }
+
+    stt_pending = False
+    job = st.session_state.get(stt_key)
+    if job and not job["applied"]:
+        if job["future"].done():
+            job["applied"] = True
+            try:
+                text = job["future"].result()
+                if text:
+                    st.session_state[transcript_key] = text
+                    st.success(
+                        "Transcription complete. You may refine the text below before submitting."
+                    )
+                else:
+                    st.error(
+                        "We could not transcribe the audio. Please try recording again."
+                    )
+            except Exception as e:
+                st.error(f"Error during transcription: {e}")
+        else:
+            stt_pending = True
+            st.info("Transcribing your answer in the background...")
+
+    st.markdown("#### Review your answer")
+    button_label = (
+        "Submit answer & go to next question"
+        if q_idx < total_q_in_round - 1
+        else "Submit answer & complete this round"
+    )
+
+    # Edits are only sent with the submit, not on every blur of the text area
+    with st.form(keys.answer_form, border=False):
+        st.text_area(
+            "Transcribed answer (you can edit this before submission):",
+            value=st.session_state[transcript_key],
+            height=160,
+            key=keys.answer_box,
+        )
+
+        st.markdown("")
+        st.form_submit_button(
+            button_label,
+            on_click=submit_answer,
+            args=(round_key, round_name, current_question, keys.answer_box),
+        )
+    if st.session_state.pop("submit_error", False):
+        st.error(
+            "Please record and transcribe your answer before submitting."
+        )
+
+    if stt_pending:
+        # Poll the transcription job by rerunning only this fragment
+        time.sleep(0.5)
+        st.rerun(scope="fragment")
 
 
 # ======================================================================
 #                           STAGE 3: INTERVIEW (VOICE)
 # ======================================================================
+FIT_SCORE_KEYS = ("overall_fit_score", "skill_match_score", "experience_fit_score")
+
+
 def render_interview():
     profile = st.session_state.profile
-    jd_info = st.session_state.jd_info
     match_report = st.session_state.match_report
     rounds = st.session_state.rounds
 
@@ -642,18 +1078,7 @@ def render_interview():
     company = profile.get("company", "the company")
     role = profile.get("role", "this role")
 
-    st.markdown(
-        """
-        <div class="glass-card fade-in">
-            <div class="section-label">Step 3</div>
-            <h2 style="margin-bottom:0.25rem;">Voice interview in progress</h2>
-            <p style="margin-top:0;">
-                The agent will read each question aloud. Respond using your microphone, then review and refine the transcript before submitting.
-            </p>
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+    st.markdown(INTERVIEW_HERO_HTML, unsafe_allow_html=True)
 
     total_rounds = len(rounds)
 
@@ -674,8 +1099,8 @@ def render_interview():
                 """
             )
 
-            if match_report:
-                scores = match_report.get("scores", {})
+            scores = (match_report or {}).get("scores") or {}
+            if any(scores.get(k) for k in FIT_SCORE_KEYS):
                 st.markdown("### Pre-interview resume ↔ JD fit")
                 col_a, col_b, col_c = st.columns(3)
                 with col_a:
@@ -698,23 +1123,17 @@ def render_interview():
             st.markdown("### Interview structure")
             for idx, rnd in enumerate(rounds, start=1):
                 st.markdown(
-                    f"- **Round {idx}:** {rnd['name']}  ·  {len(rnd['questions'])} questions"
+                    f"- **Round {idx}:** {rnd.name}  ·  {len(rnd.questions)} questions"
                 )
 
-            threshold = get_round_pass_threshold()
+            threshold = st.session_state.round_pass_threshold
             st.info(
                 "Each round is scored on a 10-point scale.\n\n"
                 f"For this profile, the pass threshold is approximately **{threshold:.1f}/10** on average."
             )
 
         st.markdown("---")
-        if st.button("Start voice interview"):
-            st.session_state.candidate_started = True
-            st.session_state.interview_finished = False
-            st.session_state.current_round_index = 0
-            st.session_state.question_index_in_round = 0
-            st.session_state.evaluations = []
-            st.rerun()
+        st.button("Start voice interview", on_click=start_interview)
         return
 
     # Main interview flow
@@ -723,31 +1142,25 @@ def render_interview():
 
         if round_idx >= total_rounds:
             st.session_state.interview_finished = True
-            st.session_state.stage = "results"
-            st.rerun()
+            goto("results")
             return
 
-        current_round = rounds[round_idx]
-        round_key = current_round["key"]
-        round_name = current_round["name"]
-        questions = current_round["questions"]
+        round_key, round_name, questions = rounds[round_idx]
         total_q_in_round = len(questions)
 
         q_idx = st.session_state.question_index_in_round
 
         # Finished all Qs in this round: decide pass/fail
         if q_idx >= total_q_in_round:
-            scores = []
-            for ev in st.session_state.evaluations:
-                if ev["round_key"] == round_key:
-                    score = ev["evaluation"].get("scores", {}).get(
-                        "overall_impression", None
-                    )
-                    if score is not None:
-                        scores.append(score)
+            with st.spinner("Scoring your answers for this round..."):
+                scored = collect_pending_evaluations()
+            if not scored:
+                st.button("🔁 Retry scoring", key="retry_round_scoring")
+                return
 
+            scores = st.session_state.round_scores.get(round_key, [])
             avg_score = sum(scores) / len(scores) if scores else 0.0
-            threshold = get_round_pass_threshold()
+            threshold = st.session_state.round_pass_threshold
 
             if avg_score >= threshold and round_idx < total_rounds - 1:
                 st.success(
@@ -759,157 +1172,35 @@ def render_interview():
                 st.rerun()
                 return
             else:
+                # goto() replaces this stage's output, so the results stage shows the outcome
                 if round_idx < total_rounds - 1:
-                    st.error(
+                    st.session_state.round_outcome = (
+                        "error",
                         f"You did not meet the threshold to progress beyond **{round_name}** "
                         f"(average score {avg_score:.2f}/10 vs threshold {threshold:.1f}). "
-                        "The interview concludes here."
+                        "The interview concludes here.",
                     )
                 else:
-                    st.success(
+                    st.session_state.round_outcome = (
+                        "success",
                         f"You have completed the final round (**{round_name}**). "
-                        "Thank you for participating in this interview simulation."
+                        "Thank you for participating in this interview simulation.",
                     )
                 st.session_state.interview_finished = True
-                st.session_state.stage = "results"
-                st.rerun()
+                goto("results")
                 return
 
         # Ask next question (voice)
-        current_question = questions[q_idx]
-
-        top_col_1, top_col_2 = st.columns([3, 1])
-        with top_col_1:
-            st.markdown(
-                f"#### {round_name} · Question {q_idx + 1} of {total_q_in_round}"
-            )
-        with top_col_2:
-            round_progress = (q_idx) / float(total_q_in_round)
-            st.progress(round_progress)
-
-        st.markdown(
-            f"""
-            <div class="glass-card fade-in" style="margin-top:0.5rem;">
-                <div class="section-label">Question</div>
-                <p style="font-size:1.02rem; margin-bottom:0;">{current_question}</p>
-            </div>
-            """,
-            unsafe_allow_html=True,
+        render_question(
+            round_idx,
+            round_key,
+            round_name,
+            questions,
         )
 
-        # Make agent speak the question
-        speak_text(
-            current_question,
-            key=f"round{round_idx}_q{q_idx}",
-        )
-
-        st.write("🎙️ Click to start recording your answer, then click again to stop:")
-
-        col_mic, col_level = st.columns([1, 2])
-
-        voice_level_key = f"voice_level_{round_idx}_{q_idx}"
-        if voice_level_key not in st.session_state:
-            st.session_state[voice_level_key] = 0.0
-
-        with col_mic:
-            st.markdown('<div class="mic-wrapper">', unsafe_allow_html=True)
-            audio = mic_recorder(
-                start_prompt="Start recording",
-                stop_prompt="Stop recording",
-                key=f"mic_{round_idx}_{q_idx}",
-            )
-            st.markdown("</div>", unsafe_allow_html=True)
-
-        with col_level:
-            st.markdown("##### Voice level (last answer)")
-            st.progress(st.session_state[voice_level_key])
-
-        # Keep transcript in session
-        transcript_key = f"transcript_{round_idx}_{q_idx}"
-        if transcript_key not in st.session_state:
-            st.session_state[transcript_key] = ""
-
-        if audio and audio.get("bytes"):
-            with st.spinner("Transcribing your answer..."):
-                try:
-                    audio_bytes = audio["bytes"]
-
-                    # Compute voice level (0–1) from audio
-                    level = compute_voice_level(audio_bytes)
-                    st.session_state[voice_level_key] = level
-
-                    text = transcribe_audio_bytes(audio_bytes)
-                    if text:
-                        st.session_state[transcript_key] = text
-                        st.success(
-                            "Transcription complete. You may refine the text below before submitting."
-                        )
-                    else:
-                        st.error(
-                            "We could not transcribe the audio. Please try recording again."
-                        )
-                except Exception as e:
-                    st.error(f"Error during transcription: {e}")
-
-        st.markdown("#### Review your answer")
-        answer = st.text_area(
-            "Transcribed answer (you can edit this before submission):",
-            value=st.session_state[transcript_key],
-            height=160,
-            key=f"answer_box_{round_idx}_{q_idx}",
-        )
-
-        button_label = (
-            "Submit answer & go to next question"
-            if q_idx < total_q_in_round - 1
-            else "Submit answer & complete this round"
-        )
-
-        st.markdown("")
-        if st.button(
-            button_label,
-            key=f"candidate_submit_{round_idx}_{q_idx}",
-        ):
-            final_answer = answer.strip()
-            if not final_answer:
-                st.error(
-                    "Please record and transcribe your answer before submitting."
-                )
-            else:
-                with st.spinner("Storing your answer and running evaluation..."):
-                    try:
-                        eval_result = evaluate_answer(
-                            question=current_question,
-                            answer_transcript=final_answer,
-                            answer_duration_seconds=None,
-                            filler_word_count=None,
-                            role_title=jd_info.get("role_title"),
-                        )
-
-                        st.session_state.evaluations.append(
-                            {
-                                "round_key": round_key,
-                                "round_name": round_name,
-                                "question": current_question,
-                                "answer": final_answer,
-                                "evaluation": eval_result,
-                                "timestamp": datetime.now().isoformat(),
-                            }
-                        )
-
-                        st.success("Your answer has been recorded.")
-                        st.session_state.question_index_in_round += 1
-                        st.rerun()
-
-                    except Exception as e:
-                        st.error(
-                            f"Error while evaluating your answer: {e}"
-                        )
-
     # If finished, move to results
     if st.session_state.interview_finished:
-        st.session_state.stage = "results"
-        st.rerun()
+        goto("results")
 
 
 # ======================================================================
@@ -921,19 +1212,21 @@ def render_results():
     role = profile.get("role", "this role")
     company = profile.get("company", "the company")
 
-    st.markdown(
-        """
-        <div class="glass-card fade-in">
-            <div class="section-label">Step 4</div>
-            <h2 style="margin-bottom:0.25rem;">Interview results & personalised feedback</h2>
-            <p style="margin-top:0;">
-                Below is a consolidated view of your performance, including strengths, improvement areas,
-                and an HR-style recommendation.
-            </p>
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+    st.markdown(RESULTS_HERO_HTML, unsafe_allow_html=True)
+
+    outcome = st.session_state.round_outcome
+    if outcome:
+        kind, message = outcome
+        if kind == "error":
+            st.error(message)
+        else:
+            st.success(message)
+
+    with st.spinner("Finalising answer evaluations..."):
+        scored = collect_pending_evaluations()
+    if not scored:
+        st.button("🔁 Retry scoring", key="retry_final_scoring")
+        return
 
     if not st.session_state.evaluations:
         st.info("No evaluations were recorded. It appears the interview did not run to completion.")
@@ -946,16 +1239,21 @@ def render_results():
         f"The voice interview for **{role}** at **{company}** is complete. Well done, {name}."
     )
 
-    # Candidate-facing feedback
-    with st.spinner("Generating your candidate-facing feedback report..."):
-        try:
-            candidate_feedback = generate_candidate_feedback(
-                role_title=st.session_state.jd_info.get("role_title", role),
-                evaluations=st.session_state.evaluations,
-            )
-        except Exception as e:
-            candidate_feedback = None
-            st.error(f"Could not generate candidate feedback: {e}")
+    role_title = st.session_state.jd_info.get("role_title", role)
+
+    # Candidate-facing feedback (generated once, then served from session state).
+    # The HR report is generated alongside it, so opening the expander is a cache hit.
+    if st.session_state.candidate_feedback is None:
+        with st.spinner("Generating your feedback and the HR report..."):
+            try:
+                reports = cached_interview_reports(
+                    role_title,
+                    evaluations_cache_key(st.session_state.evaluations),
+                )
+                st.session_state.candidate_feedback = reports["candidate_feedback"]
+            except Exception as e:
+                st.error(f"Could not generate candidate feedback: {e}")
+    candidate_feedback = st.session_state.candidate_feedback
 
     if candidate_feedback:
         col_summary, col_side = st.columns([2.3, 1])
@@ -990,14 +1288,24 @@ def render_results():
         for a in candidate_feedback.get("suggested_actions", []):
             st.write("- ", a)
 
+    # Per-round averages straight from the incrementally maintained round_scores
+    round_averages = {
+        rnd.name: sum(scores) / len(scores)
+        for rnd in st.session_state.rounds
+        if (scores := st.session_state.round_scores.get(rnd.key))
+    }
+    if round_averages:
+        st.markdown("### Average score per round")
+        st.bar_chart({"Average score": round_averages})
+
     # HR-style report + score chart
     with st.expander("HR-style report (Hire / Hold / Reject signal)", expanded=False):
         with st.spinner("Generating HR-oriented summary..."):
             try:
-                hr_report = generate_candidate_report(
-                    role_title=st.session_state.jd_info.get("role_title", role),
-                    evaluations=st.session_state.evaluations,
-                )
+                hr_report = cached_interview_reports(
+                    role_title,
+                    evaluations_cache_key(st.session_state.evaluations),
+                )["hr_report"]
 
                 st.write("### Recommendation")
                 st.write(f"**Verdict:** {hr_report.get('recommendation', 'unknown')}")
@@ -1018,10 +1326,8 @@ def render_results():
                 scores_dict = hr_report.get("aggregated_scores", {})
                 if isinstance(scores_dict, dict) and scores_dict:
                     st.write("### Score overview")
-                    df_scores = pd.DataFrame(
-                        {"Dimension": list(scores_dict.keys()), "Score": list(scores_dict.values())}
-                    ).set_index("Dimension")
-                    st.bar_chart(df_scores)
+                    # {column: {dimension: score}} charts directly, no DataFrame needed
+                    st.bar_chart({"Score": scores_dict})
 
                     st.write("Raw score data")
                     st.json(scores_dict)
@@ -1038,16 +1344,30 @@ def render_results():
 # ======================================================================
 #                           MAIN ROUTER
 # ======================================================================
-stage = st.session_state.stage
-
-if stage == "onboarding":
-    render_onboarding()
-elif stage == "analysis":
-    run_analysis()
-elif stage == "interview":
-    render_interview()
-elif stage == "results":
-    render_results()
+STAGES = {
+    "onboarding": render_onboarding,
+    "analysis": run_analysis,
+    "interview": render_interview,
+    "results": render_results,
+}
+
+# Single slot for the active stage; goto() replaces its contents in place
+stage_slot = st.empty()
+
+
+def goto(stage: str):
+    """
+    Switch stage and render it within the current run, instead of
+    setting the stage and paying for a full st.rerun().
+    """
+    st.session_state.stage = stage
+    render_flow_progress(stage)
+    with stage_slot.container():
+        STAGES[stage]()
+
+
+if st.session_state.stage in STAGES:
+    goto(st.session_state.stage)
 else:
     st.error("Unknown stage. Resetting...")
     reset_everything()
@@ -1,19 +1,9 @@
 # audio_stt.py
-import os
 import streamlit as st
-from dotenv import load_dotenv
-from google import genai
 from google.genai.types import Part, GenerateContentConfig
 
-load_dotenv()
-
-# Try env var first, then Streamlit secrets (for Cloud)
-API_KEY = os.getenv("GEMINI_API_KEY") or st.secrets.get("GEMINI_API_KEY")
-
-if not API_KEY:
-    st.error("GEMINI_API_KEY is missing. Set it in .env (local) or Streamlit secrets (cloud).")
-
-client = genai.Client(api_key=API_KEY)
+# Reuse the shared Gemini client (and its keep-alive connection pool)
+from llm_client import get_client
 
 
 def transcribe_audio_bytes(audio_bytes: bytes) -> str | None:
@@ -22,6 +12,8 @@ def transcribe_audio_bytes(audio_bytes: bytes) -> str | None:
     This is cloud-friendly (no ffmpeg, no local whisper, etc.)
 
     The mic_recorder component usually sends WEBM, so we mark mime_type as 'audio/webm'.
+    Returns None if nothing was said; raises RuntimeError if the Gemini call
+    fails, so the caller can report it (and the failure is not cached).
     """
     if not audio_bytes:
         return None
@@ -33,7 +25,7 @@ def transcribe_audio_bytes(audio_bytes: bytes) -> str | None:
             mime_type="audio/webm",  # works for mic_recorder in most browsers
         )
 
-        resp = client.models.generate_content(
+        resp = get_client().models.generate_content(
             model="gemini-2.0-flash",
             contents=[
                 audio_part,
@@ -50,6 +42,19 @@ def transcribe_audio_bytes(audio_bytes: bytes) -> str | None:
         return text if text else None
 
     except Exception as e:
-        # Surface the error in Streamlit so we can see it in the UI/logs
-        st.error(f"Error while calling Gemini for transcription: {e}")
-        return None
+        # Runs on the STT worker thread (no Streamlit context): let the script
+        # thread that reads the future show the error
+        raise RuntimeError(f"Gemini transcription call failed: {e}") from e
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_transcribe(audio_hash: str, _audio_bytes: bytes) -> str | None:
+    """
+    Memoised transcribe_audio_bytes.
+
+    Streamlit hands back the same mic payload on unrelated reruns, so key the
+    cache on a hash of the audio (the leading underscore tells Streamlit not
+    to hash the raw bytes themselves). Failures raise and are never cached,
+    so recording the same audio again retries the call.
+    """
+    return transcribe_audio_bytes(_audio_bytes)
@@ -0,0 +1,175 @@
+# cache_utils.py
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+# Cached analyses contain resume/JD text, so they stay in memory unless a
+# directory is configured explicitly.
+CACHE_DIR = os.getenv("ANALYSIS_CACHE_DIR") or None
+
+
+def sha256_hex(data: bytes | str) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def text_key(text: str) -> str:
+    """
+    Hash of the text with whitespace collapsed, so re-pasting the same JD or
+    resume with different line breaks/indentation hits the same cache entry.
+    """
+    return sha256_hex(" ".join(text.split()))
+
+
+class DiskCache:
+    """
+    Small JSON cache: an in-memory LRU in front of one file per key on disk.
+    Values must be JSON-serialisable (the LLM helpers return plain dicts).
+
+    With directory=None nothing touches the disk. Otherwise files older than
+    max_age_seconds are ignored and at most max_disk_items files are kept
+    (oldest removed first).
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str],
+        max_memory_items: int = 128,
+        max_disk_items: int = 512,
+        max_age_seconds: float = 7 * 24 * 3600,
+    ):
+        self.directory = directory
+        self.max_memory_items = max_memory_items
+        self.max_disk_items = max_disk_items
+        self.max_age_seconds = max_age_seconds
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _remember(self, key: str, raw: str) -> None:
+        # Analysis calls may run on worker threads
+        with self._lock:
+            self._memory[key] = raw
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_items:
+                self._memory.popitem(last=False)
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _read_disk(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age_seconds:
+                self._remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                raw = f.read()
+            value = json.loads(raw)
+        except OSError:
+            return None
+        except json.JSONDecodeError:
+            # Corrupt entry: drop it and treat as a miss
+            self._remove(path)
+            return None
+        self._remember(key, raw)
+        return value
+
+    def _prune_disk(self) -> None:
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                path = os.path.join(self.directory, name)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+        entries.sort()
+        for _, path in entries[: max(0, len(entries) - self.max_disk_items)]:
+            self._remove(path)
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self._memory.get(key)
+        if raw is None:
+            return self._read_disk(key) if self.directory else None
+        self._remember(key, raw)
+        # Always hand back a fresh object so callers can't mutate the cache
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any) -> None:
+        raw = json.dumps(value)
+        self._remember(key, raw)
+        if not self.directory:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write a temp file and rename it into place, so readers never see a torn file
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(raw)
+                os.replace(tmp_path, self._path(key))
+            except OSError:
+                self._remove(tmp_path)
+                raise
+            self._prune_disk()
+        except OSError:
+            # Disk cache is best-effort; the in-memory copy still helps
+            pass
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+
+analysis_cache = DiskCache(CACHE_DIR)
+
+
+# The analysis modules import llm_client, which itself uses DiskCache;
+# import them inside the wrappers to keep this module dependency-free.
+def analysis_key(prefix: str, system_prompt: str, *texts: str) -> str:
+    """
+    Cache key for an analysis: the model and a hash of the system prompt are
+    part of it, so prompt or model changes never serve stale results.
+    """
+    from llm_client import GEMINI_MODEL
+
+    parts = [GEMINI_MODEL, sha256_hex(system_prompt), *(text_key(t) for t in texts)]
+    return prefix + sha256_hex("|".join(parts))
+
+
+def cached_analysis(key: str, compute: Callable[[], Any]) -> Any:
+    from llm_client import LLM_CACHE_DISABLED
+
+    # LLM_CACHE_DISABLED=1 means always call the API, for analyses too
+    if LLM_CACHE_DISABLED:
+        return compute()
+    return analysis_cache.get_or_compute(key, compute)
+
+
+def cached_analyze_jd_and_plan(jd_text: str) -> Dict[str, Any]:
+    from question_generator import SYSTEM_PROMPT_JD_AND_PLAN, analyze_jd_and_plan
+
+    key = analysis_key("jd_plan_", SYSTEM_PROMPT_JD_AND_PLAN, jd_text)
+    return cached_analysis(key, lambda: analyze_jd_and_plan(jd_text))
+
+
+def cached_analyze_resume_and_match(resume_text: str, jd_text: str) -> Dict[str, Any]:
+    from resume_matcher import SYSTEM_PROMPT_RESUME_AND_MATCH, analyze_resume_and_match
+
+    key = analysis_key("resume_match_", SYSTEM_PROMPT_RESUME_AND_MATCH, resume_text, jd_text)
+    return cached_analysis(key, lambda: analyze_resume_and_match(resume_text, jd_text))
@@ -1,6 +1,64 @@
 # evaluator.py
-from typing import Any, Dict, Optional
-from llm_client import call_gemini_json
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from llm_client import call_gemini_json, call_gemini_json_async, is_blank_input, to_prompt_json
+
+
+# Response schemas: Gemini's structured output mode enforces these shapes,
+# so the prompts no longer spell the JSON out.
+class Star(BaseModel):
+    situation: str
+    task: str
+    action: str
+    result: str
+
+
+class Scores(BaseModel):
+    relevance: float
+    content_depth: float
+    star_completeness: float
+    role_skill_match: float
+    grammar: float
+    confidence: float
+    overall_impression: float
+
+
+class Feedback(BaseModel):
+    strengths: List[str]
+    areas_to_improve: List[str]
+
+
+class AnswerEvaluation(BaseModel):
+    star: Star
+    scores: Scores
+    feedback: Feedback
+    hr_comment: str
+
+
+class BatchEvaluation(BaseModel):
+    evaluations: List[AnswerEvaluation]
+
+
+# Scored locally: an empty transcript needs no LLM call to get a zero
+EMPTY_ANSWER_EVALUATION = {
+    "star": {"situation": "", "task": "", "action": "", "result": ""},
+    "scores": {field: 0 for field in Scores.model_fields},
+    "feedback": {
+        "strengths": [],
+        "areas_to_improve": ["No answer was given. Try to respond to every question, even briefly."],
+    },
+    "hr_comment": "No answer was given to this question.",
+}
+
+
+def is_blank_answer(answer_transcript: Optional[str]) -> bool:
+    # Short answers ("Yes", "No") are still real answers; only empty ones are skipped
+    return is_blank_input(answer_transcript, min_chars=1)
+
 
 SYSTEM_PROMPT_EVAL = """
 You are an experienced HR + Hiring Manager evaluator.
@@ -49,34 +107,21 @@ You must:
    - hr_comment: 1–2 lines explaining what this answer reveals about the candidate
      (e.g., "Strong ownership of backend projects, but limited exposure to production incidents").
 
-Return STRICT JSON:
-
-{
-  "star": {
-    "situation": "",
-    "task": "",
-    "action": "",
-    "result": ""
-  },
-  "scores": {
-    "relevance": 0-10,
-    "content_depth": 0-10,
-    "star_completeness": 0-10,
-    "role_skill_match": 0-10,
-    "grammar": 0-10,
-    "confidence": 0-10,
-    "overall_impression": 0-10
-  },
-  "feedback": {
-    "strengths": [],
-    "areas_to_improve": []
-  },
-  "hr_comment": ""
-}
+Return JSON only, following the response schema (star, scores, feedback, hr_comment).
 """
 
+SYSTEM_PROMPT_EVAL_BATCH = SYSTEM_PROMPT_EVAL + """
 
-def evaluate_answer(
+BATCH MODE:
+
+You will receive several numbered items (ITEM 1, ITEM 2, ...), each with its own
+question and answer_transcript. Evaluate every item independently using the rules above.
+
+Return one evaluation per item under "evaluations", in the same order as the items.
+"""
+
+
+def build_eval_prompt(
     question: str,
     answer_transcript: str,
     answer_duration_seconds: Optional[float],
@@ -85,8 +130,8 @@ def evaluate_answer(
     jd_info: Optional[Dict[str, Any]] = None,
     resume_info: Optional[Dict[str, Any]] = None,
     match_report: Optional[Dict[str, Any]] = None,
-) -> Dict[str, Any]:
-    user_prompt = f"""
+) -> str:
+    return f"""
 ROLE TITLE:
 {role_title}
 
@@ -101,12 +146,196 @@ OPTIONAL METRICS:
 - Approx filler words (um/uh/etc.): {filler_word_count}
 
 JD INFO:
-{jd_info}
+{to_prompt_json(jd_info)}
 
 RESUME INFO:
-{resume_info}
+{to_prompt_json(resume_info)}
 
 MATCH REPORT:
-{match_report}
+{to_prompt_json(match_report)}
 """
-    return call_gemini_json(SYSTEM_PROMPT_EVAL, user_prompt)
+
+
+def evaluate_answer(
+    question: str,
+    answer_transcript: str,
+    answer_duration_seconds: Optional[float],
+    filler_word_count: Optional[int],
+    role_title: Optional[str],
+    jd_info: Optional[Dict[str, Any]] = None,
+    resume_info: Optional[Dict[str, Any]] = None,
+    match_report: Optional[Dict[str, Any]] = None,
+    on_chunk: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    if is_blank_answer(answer_transcript):
+        return deepcopy(EMPTY_ANSWER_EVALUATION)
+
+    user_prompt = build_eval_prompt(
+        question,
+        answer_transcript,
+        answer_duration_seconds,
+        filler_word_count,
+        role_title,
+        jd_info,
+        resume_info,
+        match_report,
+    )
+    return call_gemini_json(
+        SYSTEM_PROMPT_EVAL,
+        user_prompt,
+        on_chunk=on_chunk,
+        response_schema=AnswerEvaluation,
+    )
+
+
+async def evaluate_answer_async(
+    question: str,
+    answer_transcript: str,
+    answer_duration_seconds: Optional[float],
+    filler_word_count: Optional[int],
+    role_title: Optional[str],
+    jd_info: Optional[Dict[str, Any]] = None,
+    resume_info: Optional[Dict[str, Any]] = None,
+    match_report: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Async variant of evaluate_answer, so many answers can be scored concurrently.
+    """
+    if is_blank_answer(answer_transcript):
+        return deepcopy(EMPTY_ANSWER_EVALUATION)
+
+    user_prompt = build_eval_prompt(
+        question,
+        answer_transcript,
+        answer_duration_seconds,
+        filler_word_count,
+        role_title,
+        jd_info,
+        resume_info,
+        match_report,
+    )
+    return await call_gemini_json_async(
+        SYSTEM_PROMPT_EVAL, user_prompt, response_schema=AnswerEvaluation
+    )
+
+
+def evaluate_answers_batch(
+    items: List[Dict[str, Any]],
+    role_title: Optional[str],
+    jd_info: Optional[Dict[str, Any]] = None,
+    resume_info: Optional[Dict[str, Any]] = None,
+    match_report: Optional[Dict[str, Any]] = None,
+    on_chunk: Optional[Callable[[str], None]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Evaluate several answers with a single LLM call.
+
+    items: [{ "question", "answer_transcript", optional "answer_duration_seconds",
+              optional "filler_word_count" }, ...]
+    Returns one evaluation dict per item, in order. If the model returns the
+    wrong number of evaluations, falls back to scoring each item separately
+    (concurrently, via evaluate_answers).
+    on_chunk, if given, receives the raw streamed model output as it arrives.
+    Blank answers get EMPTY_ANSWER_EVALUATION and are left out of the prompt.
+    """
+    if not items:
+        return []
+
+    blank = [is_blank_answer(item.get("answer_transcript")) for item in items]
+    if any(blank):
+        answered = iter(
+            evaluate_answers_batch(
+                [item for item, is_blank in zip(items, blank) if not is_blank],
+                role_title,
+                jd_info,
+                resume_info,
+                match_report,
+                on_chunk,
+            )
+        )
+        return [
+            deepcopy(EMPTY_ANSWER_EVALUATION) if is_blank else next(answered)
+            for is_blank in blank
+        ]
+
+    item_blocks = []
+    for idx, item in enumerate(items, start=1):
+        item_blocks.append(
+            f"""
+ITEM {idx}:
+QUESTION:
+{item.get("question")}
+
+ANSWER (TRANSCRIBED):
+{item.get("answer_transcript")}
+
+OPTIONAL METRICS:
+- Approx answer duration (seconds): {item.get("answer_duration_seconds")}
+- Approx filler words (um/uh/etc.): {item.get("filler_word_count")}
+"""
+        )
+
+    user_prompt = f"""
+ROLE TITLE:
+{role_title}
+
+JD INFO:
+{to_prompt_json(jd_info)}
+
+RESUME INFO:
+{to_prompt_json(resume_info)}
+
+MATCH REPORT:
+{to_prompt_json(match_report)}
+
+ITEMS TO EVALUATE ({len(items)}):
+{"".join(item_blocks)}
+"""
+    result = call_gemini_json(
+        SYSTEM_PROMPT_EVAL_BATCH,
+        user_prompt,
+        on_chunk=on_chunk,
+        response_schema=BatchEvaluation,
+    )
+    evaluations = result.get("evaluations")
+
+    if isinstance(evaluations, list) and len(evaluations) == len(items):
+        return evaluations
+
+    return evaluate_answers(items, role_title, jd_info, resume_info, match_report)
+
+
+# Cap on concurrent per-answer calls (provider rate limits / connection pool)
+MAX_CONCURRENT_EVALS = 8
+
+
+def evaluate_answers(
+    items: List[Dict[str, Any]],
+    role_title: Optional[str],
+    jd_info: Optional[Dict[str, Any]] = None,
+    resume_info: Optional[Dict[str, Any]] = None,
+    match_report: Optional[Dict[str, Any]] = None,
+    max_concurrency: int = MAX_CONCURRENT_EVALS,
+) -> List[Dict[str, Any]]:
+    """
+    Evaluate each item with its own LLM call, running the calls concurrently
+    on a thread pool with the shared sync client.
+    Same item format as evaluate_answers_batch; results keep the input order.
+    """
+    if not items:
+        return []
+
+    def evaluate_one(item: Dict[str, Any]) -> Dict[str, Any]:
+        return evaluate_answer(
+            question=item.get("question"),
+            answer_transcript=item.get("answer_transcript"),
+            answer_duration_seconds=item.get("answer_duration_seconds"),
+            filler_word_count=item.get("filler_word_count"),
+            role_title=role_title,
+            jd_info=jd_info,
+            resume_info=resume_info,
+            match_report=match_report,
+        )
+
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(items))) as ex:
+        return list(ex.map(evaluate_one, items))
@@ -1,22 +1,64 @@
 # file_utils.py
-from typing import Optional
+from typing import List, Optional
 from io import BytesIO
+from itertools import islice
 
-from PyPDF2 import PdfReader
+try:
+    # Optional native (PDFium) extractor; much faster than PyPDF2's pure-Python parser
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
 
 
-def extract_text_from_pdf(file_bytes: bytes) -> Optional[str]:
+# Resumes rarely run past a couple of pages; anything beyond this is ignored.
+MAX_PDF_PAGES = 5
+
+
+def _page_texts_pdfium(file_bytes: bytes, max_pages: Optional[int]) -> List[str]:
+    pdf = pdfium.PdfDocument(file_bytes)
+    try:
+        n_pages = len(pdf) if max_pages is None else min(len(pdf), max_pages)
+        texts = []
+        for idx in range(n_pages):
+            page = pdf[idx]
+            textpage = page.get_textpage()
+            texts.append(textpage.get_text_range().replace("\r\n", "\n"))
+            textpage.close()
+            page.close()
+        return texts
+    finally:
+        pdf.close()
+
+
+def _page_texts_pypdf2(file_bytes: bytes, max_pages: Optional[int]) -> List[str]:
+    # Imported on first use: with pypdfium2 installed this fallback rarely runs
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(BytesIO(file_bytes), strict=False)
+    return [page.extract_text() or "" for page in islice(reader.pages, max_pages)]
+
+
+def extract_text_from_pdf(
+    file_bytes: bytes, max_pages: Optional[int] = MAX_PDF_PAGES
+) -> Optional[str]:
     """
-    Extract text from a PDF (bytes).
+    Extract text from a PDF (bytes), page by page, stopping after max_pages
+    (None = all pages). Pages past the cap are never parsed.
+    Uses pypdfium2 when installed, falling back to PyPDF2.
     Returns None if extraction fails or is empty.
     """
     try:
-        reader = PdfReader(BytesIO(file_bytes))
-        texts = []
-        for page in reader.pages:
-            txt = page.extract_text() or ""
-            texts.append(txt)
-        full_text = "\n".join(texts).strip()
+        texts = None
+        if pdfium is not None:
+            try:
+                texts = _page_texts_pdfium(file_bytes, max_pages)
+            except Exception:
+                texts = None
+        if texts is None:
+            texts = _page_texts_pypdf2(file_bytes, max_pages)
+
+        # Blank/scanned pages would only add empty lines to the LLM prompt
+        full_text = "\n".join(txt for txt in texts if txt.strip()).strip()
         return full_text or None
     except Exception:
         return None
@@ -1,6 +1,7 @@
 # jd_analyzer.py
+from copy import deepcopy
 
-from llm_client import call_gemini_json
+from llm_client import call_gemini_json, is_blank_input
 
 SYSTEM_PROMPT_JD = """
 You analyse job descriptions for an AI interview agent.
@@ -16,8 +17,21 @@ Given a job description text, you must extract:
 Return a JSON object with exactly these keys.
 """
 
+# Returned without an LLM call when the JD text is blank/near-empty
+EMPTY_JD_INFO = {
+    "core_technical_skills": [],
+    "secondary_technical_skills": [],
+    "soft_skills": [],
+    "experience_level": "",
+    "role_title": "",
+    "summary": "",
+}
+
 
 def analyze_job_description(jd_text: str):
+    if is_blank_input(jd_text):
+        return deepcopy(EMPTY_JD_INFO)
+
     user_prompt = f"""
 Job Description:
 \"\"\"{jd_text}\"\"\"
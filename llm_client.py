@@ -1,34 +1,123 @@
 # llm_client.py
+import asyncio
 import os
-import json
-from typing import Any, Dict
+import threading
+from functools import cache
+from typing import Any, Callable, Dict, Optional
 
+import httpx
+import orjson
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
 
+from cache_utils import DiskCache, sha256_hex
+
 # Load environment variables
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-if not GEMINI_API_KEY:
-    raise RuntimeError("GEMINI_API_KEY is not set in .env or environment variables.")
+# Configure Gemini client.
+# One shared client for the whole process (LLM + speech-to-text), so the
+# underlying httpx pools keep connections alive instead of re-doing TLS per call.
+# HTTP/2 (needs the h2 package, via httpx[http2]) multiplexes concurrent
+# requests over the pooled connections.
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+HTTP_CLIENT_ARGS = {"limits": HTTP_LIMITS, "http2": True}
+
+# Transient failures (rate limits, overloaded backends) are retried by the SDK
+# with jittered exponential backoff instead of surfacing to the candidate.
+HTTP_RETRY = types.HttpRetryOptions(
+    attempts=5,
+    initial_delay=1.0,
+    max_delay=30.0,
+    http_status_codes=[408, 429, 500, 502, 503, 504],
+)
+# Per-request timeout in milliseconds; generous enough for a batched round evaluation
+HTTP_TIMEOUT_MS = int(os.getenv("LLM_TIMEOUT_MS", "60000"))
+
+
+def build_client() -> genai.Client:
+    """
+    Build a Gemini client with the shared pool/retry/timeout options.
+    """
+    if not GEMINI_API_KEY:
+        raise RuntimeError("GEMINI_API_KEY is not set in .env or environment variables.")
+    return genai.Client(
+        api_key=GEMINI_API_KEY,
+        http_options=types.HttpOptions(
+            timeout=HTTP_TIMEOUT_MS,
+            retry_options=HTTP_RETRY,
+            client_args=HTTP_CLIENT_ARGS,
+            async_client_args=HTTP_CLIENT_ARGS,
+        ),
+    )
+
+
+@cache
+def get_client() -> genai.Client:
+    """
+    The process-wide Gemini client for sync calls, built on first use.
+    Importing this module stays cheap, and tests can monkeypatch get_client.
+    Sync callers that want concurrency fan out over threads with this client;
+    they must not wrap the async helpers in asyncio.run() (see get_aio_client).
+    """
+    return build_client()
+
+
+# The aio client's httpx AsyncClient is bound to the event loop it first runs
+# on, so it is owned by exactly one live loop (uvicorn's, in the API).
+_aio_lock = threading.Lock()
+_aio_loop: Optional[asyncio.AbstractEventLoop] = None
+_aio_client: Any = None
+
+
+def get_aio_client() -> Any:
+    """
+    The async (aio) Gemini client for the running event loop.
+
+    Only one live loop may use it: a call from a second loop while the first
+    is still open raises RuntimeError instead of driving one AsyncClient from
+    two loops. Once the owning loop has closed, the next loop gets a fresh client.
+    """
+    global _aio_loop, _aio_client
+    loop = asyncio.get_running_loop()
+    with _aio_lock:
+        if loop is not _aio_loop:
+            if _aio_loop is not None and not _aio_loop.is_closed():
+                raise RuntimeError(
+                    "The Gemini aio client is bound to another running event loop; "
+                    "use the sync client (get_client) from other threads."
+                )
+            _aio_client = build_client().aio
+            _aio_loop = loop
+        return _aio_client
+
 
-# Configure Gemini client
-client = genai.Client(api_key=GEMINI_API_KEY)
 GEMINI_MODEL = "gemini-2.0-flash"
 
 
-def call_gemini_json(
-    system_prompt: str,
-    user_prompt: str,
-    temperature: float = 0.3,
-) -> Dict[str, Any]:
+def warm_up() -> None:
     """
-    Call Gemini and force a strict JSON response.
+    Open a pooled connection to Gemini with a cheap metadata call
+    (no generation), so the first real request skips TLS/connection setup.
+    """
+    get_client().models.get(model=GEMINI_MODEL)
+
+
+async def warm_up_async() -> None:
+    """
+    Same as warm_up, for the async (aio) connection pool.
     """
-    full_prompt = f"""
+    await get_aio_client().models.get(model=GEMINI_MODEL)
+
+
+def build_json_prompt(system_prompt: str, user_prompt: str) -> str:
+    """
+    Wrap the system + user prompt in the strict-JSON instruction template.
+    """
+    return f"""
 You are a strict JSON generator.
 
 SYSTEM INSTRUCTION:
@@ -42,30 +131,172 @@ Rules:
 - No extra commentary or text outside JSON.
 """
 
-    response = client.models.generate_content(
-        model=GEMINI_MODEL,
-        contents=full_prompt,
-        config=types.GenerateContentConfig(
-            temperature=temperature,
-        ),
-    )
 
-    text = (response.text or "").strip()
+def to_prompt_json(value: Any) -> str:
+    """
+    Serialise structured data (jd_info, evaluations, ...) for a prompt as
+    compact JSON, rather than Python repr with single quotes and None/True.
+    """
+    return orjson.dumps(value, default=str).decode("utf-8")
+
+
+# Documents (JD, resume) shorter than this cannot be analysed meaningfully
+MIN_INPUT_CHARS = 20
 
-    # Try to parse directly
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        # Try to trim to outermost JSON object
-        start = text.find("{")
-        end = text.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            candidate = text[start : end + 1]
-            try:
-                return json.loads(candidate)
-            except json.JSONDecodeError:
-                pass
 
+def is_blank_input(text: Optional[str], min_chars: int = MIN_INPUT_CHARS) -> bool:
+    """
+    True for missing, whitespace-only or near-empty inputs. Entry points use it
+    to return an empty template instead of paying a Gemini round trip for them.
+    """
+    return not text or len(text.strip()) < min_chars
+
+
+def parse_json_response(text: str) -> Dict[str, Any]:
+    """
+    Parse the model output as JSON. Requests run in JSON mode
+    (response_mime_type="application/json"), so the reply is the bare object.
+    """
+    try:
+        return orjson.loads(text or "")
+    except orjson.JSONDecodeError:
         raise ValueError(
-            "Gemini did not return valid JSON. Raw response:\n" + text
+            "Gemini did not return valid JSON. Raw response:\n" + (text or "")
+        )
+
+
+# ---------- Exact-prompt response cache ----------
+# Identical (model, temperature, schema, prompt) requests reuse the parsed reply.
+# Set LLM_CACHE_DISABLED=1 to always call the API.
+LLM_CACHE_DISABLED = os.getenv("LLM_CACHE_DISABLED") == "1"
+# Prompts include resume text and answers, so replies are only persisted to
+# disk when LLM_CACHE_DIR is set; otherwise the cache is in-memory only.
+response_cache = DiskCache(os.getenv("LLM_CACHE_DIR") or None)
+
+
+@cache
+def schema_fingerprint(response_schema: Optional[Any]) -> str:
+    """
+    Hash of the schema's full JSON shape (not just its name), so editing a
+    pydantic model's fields invalidates replies cached in the old shape.
+    """
+    if hasattr(response_schema, "model_json_schema"):
+        shape = orjson.dumps(response_schema.model_json_schema(), option=orjson.OPT_SORT_KEYS)
+        return sha256_hex(shape)
+    return sha256_hex(repr(response_schema))
+
+
+def response_cache_key(contents: str, temperature: float, response_schema: Optional[Any]) -> str:
+    schema = schema_fingerprint(response_schema)
+    return sha256_hex(f"{GEMINI_MODEL}|{temperature}|{schema}|{contents}")
+
+
+def get_cached_response(key: str) -> Optional[Dict[str, Any]]:
+    if LLM_CACHE_DISABLED:
+        return None
+    return response_cache.get(key)
+
+
+def store_cached_response(key: str, result: Dict[str, Any]) -> None:
+    if not LLM_CACHE_DISABLED:
+        response_cache.set(key, result)
+
+
+@cache
+def build_config(temperature: float, response_schema: Optional[Any] = None) -> types.GenerateContentConfig:
+    """
+    Generation config in JSON mode, so Gemini emits a bare JSON document
+    (no fences or prose). With a response_schema (e.g. a pydantic model) the
+    reply is also constrained to that shape.
+    Memoised per (temperature, schema): only a handful of combinations exist,
+    so every call reuses the same config object. Treat it as read-only.
+    """
+    return types.GenerateContentConfig(
+        temperature=temperature,
+        response_mime_type="application/json",
+        response_schema=response_schema,
+    )
+
+
+def build_contents(prompt: str) -> types.Content:
+    """
+    Wrap the prompt as a single user Content, so the SDK does not have to
+    convert a bare string into a Content/Part tree on every request.
+    """
+    return types.Content(role="user", parts=[types.Part.from_text(text=prompt)])
+
+
+def call_gemini_json(
+    system_prompt: str,
+    user_prompt: str,
+    temperature: float = 0.3,
+    on_chunk: Optional[Callable[[str], None]] = None,
+    response_schema: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """
+    Call Gemini and force a strict JSON response.
+
+    If on_chunk is given, the response is streamed and on_chunk is called with
+    each text chunk as it arrives (e.g. to show progress in the UI). The JSON
+    is parsed once the stream has finished.
+    If response_schema is given, the output is constrained to that schema.
+    Replies are cached on the exact prompt (see response_cache); a cache hit
+    returns immediately without calling on_chunk.
+    """
+    contents = build_json_prompt(system_prompt, user_prompt)
+    cache_key = response_cache_key(contents, temperature, response_schema)
+    cached = get_cached_response(cache_key)
+    if cached is not None:
+        return cached
+
+    config = build_config(temperature, response_schema)
+    request_contents = build_contents(contents)
+
+    if on_chunk is None:
+        response = get_client().models.generate_content(
+            model=GEMINI_MODEL,
+            contents=request_contents,
+            config=config,
         )
+        result = parse_json_response(response.text)
+    else:
+        parts = []
+        for chunk in get_client().models.generate_content_stream(
+            model=GEMINI_MODEL,
+            contents=request_contents,
+            config=config,
+        ):
+            text = chunk.text or ""
+            if text:
+                parts.append(text)
+                on_chunk(text)
+        result = parse_json_response("".join(parts))
+
+    store_cached_response(cache_key, result)
+    return result
+
+
+async def call_gemini_json_async(
+    system_prompt: str,
+    user_prompt: str,
+    temperature: float = 0.3,
+    response_schema: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """
+    Async twin of call_gemini_json, using the aio client of the running loop
+    (see get_aio_client).
+    """
+    contents = build_json_prompt(system_prompt, user_prompt)
+    cache_key = response_cache_key(contents, temperature, response_schema)
+    cached = get_cached_response(cache_key)
+    if cached is not None:
+        return cached
+
+    response = await get_aio_client().models.generate_content(
+        model=GEMINI_MODEL,
+        contents=build_contents(contents),
+        config=build_config(temperature, response_schema),
+    )
+    result = parse_json_response(response.text)
+    store_cached_response(cache_key, result)
+    return result
@@ -1,6 +1,12 @@
 # question_generator.py
+from collections import namedtuple
+from copy import deepcopy
 from typing import Dict, List, Any
-from llm_client import call_gemini_json
+from jd_analyzer import EMPTY_JD_INFO, SYSTEM_PROMPT_JD
+from llm_client import call_gemini_json, is_blank_input, to_prompt_json
+
+# One interview round; questions is a tuple so the whole round is immutable/hashable.
+Round = namedtuple("Round", "key name questions")
 
 SYSTEM_PROMPT_QUESTIONS = """
 You are an experienced HR interviewer designing a realistic interview process.
@@ -69,12 +75,12 @@ def generate_interview_plan(jd_info: Dict[str, Any]) -> Dict[str, Any]:
     """
     user_prompt = f"""
 JD INFO:
-{jd_info}
+{to_prompt_json(jd_info)}
 """
     return call_gemini_json(SYSTEM_PROMPT_QUESTIONS, user_prompt)
 
 
-def build_rounds(jd_info: Dict[str, Any], plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+def build_rounds(jd_info: Dict[str, Any], plan: Dict[str, Any]) -> List[Round]:
     """
     Convert the LLM-designed plan into the format used by app.py.
 
@@ -93,12 +99,12 @@ def build_rounds(jd_info: Dict[str, Any], plan: Dict[str, Any]) -> List[Dict[str
 
     We will normalize into:
     [
-      { "key": round_key, "name": round_name, "questions": [...] },
+      Round(key=round_key, name=round_name, questions=(...)),
       ...
     ]
     """
     raw_rounds = plan.get("rounds", []) or []
-    rounds: List[Dict[str, Any]] = []
+    rounds: List[Round] = []
 
     for r in raw_rounds:
         round_key = r.get("round_key") or r.get("key")
@@ -117,11 +123,58 @@ def build_rounds(jd_info: Dict[str, Any], plan: Dict[str, Any]) -> List[Dict[str
 
         if clean_questions:
             rounds.append(
-                {
-                    "key": round_key,
-                    "name": round_name,
-                    "questions": clean_questions,
-                }
+                Round(
+                    key=round_key,
+                    name=round_name,
+                    questions=tuple(clean_questions),
+                )
             )
 
-    return rounds
\ No newline at end of file
+    return rounds
+
+
+SYSTEM_PROMPT_JD_AND_PLAN = f"""
+You will complete two tasks in a single pass.
+
+=== TASK 1: JD ANALYSIS ===
+{SYSTEM_PROMPT_JD}
+
+=== TASK 2: INTERVIEW PLAN ===
+Use your TASK 1 analysis as the "Parsed JD info" input for this task.
+{SYSTEM_PROMPT_QUESTIONS}
+
+=== OUTPUT ===
+Return ONE STRICT JSON object combining both tasks:
+
+{{
+  "jd_info": {{ ...TASK 1 object... }},
+  "plan": {{ "rounds": [ ...TASK 2 rounds... ] }}
+}}
+"""
+
+
+def analyze_jd_and_plan(jd_text: str) -> Dict[str, Any]:
+    """
+    Analyse the JD and design the interview plan with a single LLM call.
+
+    Returns:
+    {
+      "jd_info": {...},   # same shape as analyze_job_description
+      "plan": {...},      # same shape as generate_interview_plan
+    }
+    Pass both to build_rounds to get the Round list (kept out of the result
+    so it stays JSON-serialisable for caching).
+    A blank JD returns an empty plan (no rounds) without calling the LLM.
+    """
+    if is_blank_input(jd_text):
+        return {"jd_info": deepcopy(EMPTY_JD_INFO), "plan": {"rounds": []}}
+
+    user_prompt = f"""
+Job Description:
+\"\"\"{jd_text}\"\"\"
+"""
+    result = call_gemini_json(SYSTEM_PROMPT_JD_AND_PLAN, user_prompt)
+    return {
+        "jd_info": result.get("jd_info") or {},
+        "plan": result.get("plan") or {},
+    }
@@ -1,70 +1,153 @@
 # report_generator.py
 
-from typing import List, Dict, Any
-from llm_client import call_gemini_json
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Literal
+
+from pydantic import BaseModel
+
+from llm_client import call_gemini_json, to_prompt_json
+
+
+# Only the fields each prompt actually reads are sent: no STAR blocks,
+# timestamps or ids, and the HR report works from scores/comments, not transcripts.
+HR_EVALUATION_KEYS = ("scores", "feedback", "hr_comment")
+FEEDBACK_EVALUATION_KEYS = ("scores", "feedback")
+
+
+def compact_evaluations(
+    evaluations: List[Dict[str, Any]],
+    evaluation_keys: tuple,
+    include_answer: bool,
+) -> List[Dict[str, Any]]:
+    compact = []
+    for item in evaluations:
+        evaluation = item.get("evaluation") or {}
+        entry = {"round_name": item.get("round_name"), "question": item.get("question")}
+        if include_answer:
+            entry["answer"] = item.get("answer")
+        entry["evaluation"] = {key: evaluation.get(key) for key in evaluation_keys}
+        compact.append(entry)
+    return compact
+
+
+# Per-answer score fields averaged into each HR category score.
+AGGREGATE_SCORE_MAP = {
+    "technical_skill": ("role_skill_match", "content_depth"),
+    "behavioral_skill": ("relevance", "star_completeness"),
+    "communication_and_grammar": ("grammar",),
+    "confidence": ("confidence",),
+    "culture_fit": ("overall_impression",),
+    "overall_recommendation_score": ("overall_impression",),
+}
+
+
+def _mean(values: List[float]) -> float:
+    return round(sum(values) / len(values), 1) if values else 0.0
+
+
+def _score_values(evaluations: List[Dict[str, Any]], fields: tuple) -> List[float]:
+    values = []
+    for item in evaluations:
+        scores = (item.get("evaluation") or {}).get("scores") or {}
+        for field in fields:
+            try:
+                values.append(float(scores[field]))
+            except (KeyError, TypeError, ValueError):
+                continue
+    return values
+
+
+def _aggregate_scores(evaluations: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Average the per-answer scores into the six HR category scores (0-10)
+    using AGGREGATE_SCORE_MAP. culture_fit only looks at culture rounds,
+    falling back to all answers when the plan had none.
+    """
+    culture_answers = [
+        item for item in evaluations
+        if "culture" in str(item.get("round_name", "")).lower()
+    ]
+    aggregated = {}
+    for category, fields in AGGREGATE_SCORE_MAP.items():
+        source = culture_answers if category == "culture_fit" and culture_answers else evaluations
+        aggregated[category] = _mean(_score_values(source, fields))
+    return aggregated
+
+
+def build_report_prompt(role_title: str, evaluations: List[Dict[str, Any]]) -> str:
+    return f"""
+role_title: {role_title}
+
+per_answer_evaluations:
+{to_prompt_json(evaluations)}
+"""
+
+
+def build_hr_prompt(
+    role_title: str,
+    evaluations: List[Dict[str, Any]],
+    aggregated_scores: Dict[str, float],
+) -> str:
+    return f"""
+role_title: {role_title}
+
+aggregated_scores:
+{to_prompt_json(aggregated_scores)}
+
+per_answer_evaluations:
+{to_prompt_json(compact_evaluations(evaluations, HR_EVALUATION_KEYS, include_answer=False))}
+"""
+
+
+def build_feedback_prompt(role_title: str, evaluations: List[Dict[str, Any]]) -> str:
+    return build_report_prompt(
+        role_title, compact_evaluations(evaluations, FEEDBACK_EVALUATION_KEYS, include_answer=True)
+    )
+
 
 # ---------- HR-FACING REPORT (Hire / Reject + Reasons) ----------
 
+# Response schema: the model writes only the narrative fields; the scores
+# are computed locally by _aggregate_scores.
+class HRReport(BaseModel):
+    recommendation: Literal["strong_hire", "hire", "hold", "reject"]
+    recommendation_reasons: List[str]
+    strengths: List[str]
+    weaknesses: List[str]
+    final_verdict_line: str
+
+
 SYSTEM_PROMPT_REPORT = """
 You are an HR manager summarizing an interview.
 
 You will receive:
 - role_title
+- aggregated_scores: category scores (0-10) already computed from the answers
+  (technical_skill, behavioral_skill, communication_and_grammar, confidence,
+  culture_fit, overall_recommendation_score)
 - list of per-answer evaluations, each containing:
-  - round_key
   - round_name
   - question
-  - answer
-  - evaluation (with scores, feedback, hr_comment, star)
-  - timestamp
+  - evaluation (with scores, feedback, hr_comment)
+
+Do NOT recompute or output the aggregated scores; base your judgement on them.
 
 Your tasks:
 
-1. Compute overall category scores (0-10) for:
-   - technical_skill
-   - behavioral_skill
-   - communication_and_grammar
-   - confidence
-   - culture_fit
-   - overall_recommendation_score
-
-   Use the underlying per-answer scores:
-   - role_skill_match, content_depth -> technical_skill
-   - relevance, star_completeness -> behavioral_skill
-   - grammar -> communication_and_grammar
-   - confidence -> confidence
-   - answers to culture/culture-fit questions -> culture_fit
-   - overall_impression -> overall_recommendation_score
-
-2. Decide a recommendation as one of:
+1. Decide a recommendation as one of:
    ["strong_hire", "hire", "hold", "reject"]
 
-3. Explain the recommendation in 2–3 bullet points from an HR point of view,
+2. Explain the recommendation in 2–3 bullet points from an HR point of view,
    e.g. "Rejected because technical depth is too low for this role".
 
-4. Write:
+3. Write:
    - strengths: 3 bullet points (what this candidate does well)
    - weaknesses: 3 bullet points (where they may struggle)
    - final_verdict_line: one sentence HR verdict, e.g.
      "Overall verdict: Reject – communication is good but core technical skills are insufficient for a Backend Engineer role."
 
-Return STRICT JSON with the following structure and nothing else:
-
-{
-  "aggregated_scores": {
-    "technical_skill": 0-10,
-    "behavioral_skill": 0-10,
-    "communication_and_grammar": 0-10,
-    "confidence": 0-10,
-    "culture_fit": 0-10,
-    "overall_recommendation_score": 0-10
-  },
-  "recommendation": "strong_hire" | "hire" | "hold" | "reject",
-  "recommendation_reasons": ["...", "..."],
-  "strengths": ["...", "..."],
-  "weaknesses": ["...", "..."],
-  "final_verdict_line": "..."
-}
+Return JSON only, following the response schema (recommendation,
+recommendation_reasons, strengths, weaknesses, final_verdict_line).
 """
 
 
@@ -75,18 +158,15 @@ def generate_candidate_report(
     """
     HR-facing report generator.
     Uses all per-question evaluations to produce:
-    - aggregated scores
+    - aggregated scores (computed locally, not by the LLM)
     - hire/hold/reject
     - reasons, strengths, weaknesses, verdict line
     """
-    user_prompt = f"""
-role_title: {role_title}
-
-per_answer_evaluations:
-{evaluations}
-"""
-    report = call_gemini_json(SYSTEM_PROMPT_REPORT, user_prompt)
-    return report
+    aggregated_scores = _aggregate_scores(evaluations)
+    user_prompt = build_hr_prompt(role_title, evaluations, aggregated_scores)
+    report = call_gemini_json(SYSTEM_PROMPT_REPORT, user_prompt, response_schema=HRReport)
+    # Local scores go last so nothing in the reply can override them
+    return {**report, "aggregated_scores": aggregated_scores}
 
 
 # ---------- CANDIDATE-FACING FEEDBACK (How to Improve) ----------
@@ -97,6 +177,7 @@ You are a friendly career coach.
 You will receive:
 - role_title
 - list of per-answer evaluations, each containing:
+  - round_name
   - question
   - answer
   - evaluation (with scores, feedback)
@@ -133,11 +214,24 @@ def generate_candidate_feedback(
     - areas to improve
     - concrete next steps
     """
-    user_prompt = f"""
-role_title: {role_title}
-
-per_answer_evaluations:
-{evaluations}
-"""
+    user_prompt = build_feedback_prompt(role_title, evaluations)
     feedback = call_gemini_json(SYSTEM_PROMPT_CANDIDATE_FEEDBACK, user_prompt)
     return feedback
+
+
+# ---------- BOTH REPORTS AT ONCE ----------
+
+def generate_interview_reports(
+    role_title: str,
+    evaluations: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Generate the candidate feedback and the HR report concurrently.
+    The two calls are independent and run on threads with the shared sync
+    client, so the wait is one LLM round trip, not two.
+    Returns { "candidate_feedback", "hr_report" }.
+    """
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        f_feedback = ex.submit(generate_candidate_feedback, role_title, evaluations)
+        f_report = ex.submit(generate_candidate_report, role_title, evaluations)
+        return {"candidate_feedback": f_feedback.result(), "hr_report": f_report.result()}
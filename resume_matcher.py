@@ -1,6 +1,7 @@
 # resume_matcher.py
+from copy import deepcopy
 from typing import Dict, Any
-from llm_client import call_gemini_json
+from llm_client import call_gemini_json, is_blank_input
 
 SYSTEM_PROMPT_RESUME_ANALYSIS = """
 You are an experienced technical recruiter.
@@ -29,13 +30,32 @@ Return STRICT JSON with:
 }
 """
 
+# Empty templates returned without an LLM call for blank/near-empty input
+EMPTY_RESUME_INFO = {
+    "headline": "",
+    "years_of_experience": "",
+    "core_technical_skills": [],
+    "secondary_skills": [],
+    "soft_skills": [],
+    "key_projects": [],
+    "roles_and_domains": [],
+}
 
-def analyze_resume(resume_text: str) -> Dict[str, Any]:
-    user_prompt = f"""
-RESUME TEXT:
-\"\"\"{resume_text}\"\"\"
-"""
-    return call_gemini_json(SYSTEM_PROMPT_RESUME_ANALYSIS, user_prompt)
+EMPTY_MATCH_REPORT = {
+    "scores": {
+        "skill_match_score": 0,
+        "experience_fit_score": 0,
+        "overall_fit_score": 0,
+    },
+    "strong_matches": [],
+    "missing_critical_skills": [],
+    "optional_nice_to_have_skills": [],
+    "overindexed_areas": [],
+    "candidate_summary": "",
+    "candidate_improvement_tips": [],
+    "hr_risk_flags": [],
+    "hr_overall_comment": "",
+}
 
 
 SYSTEM_PROMPT_RESUME_MATCH = """
@@ -86,12 +106,50 @@ Return STRICT JSON:
 """
 
 
-def match_resume_to_jd(jd_info: Dict[str, Any], resume_info: Dict[str, Any]) -> Dict[str, Any]:
+SYSTEM_PROMPT_RESUME_AND_MATCH = f"""
+You will complete two tasks in a single pass.
+
+=== TASK 1: RESUME ANALYSIS ===
+{SYSTEM_PROMPT_RESUME_ANALYSIS}
+
+=== TASK 2: RESUME vs JD MATCH ===
+Use your TASK 1 analysis as "resume_info" and the raw job description text as "jd_info".
+{SYSTEM_PROMPT_RESUME_MATCH}
+
+=== OUTPUT ===
+Return ONE STRICT JSON object combining both tasks:
+
+{{
+  "resume_info": {{ ...TASK 1 object... }},
+  "match_report": {{ ...TASK 2 object... }}
+}}
+"""
+
+
+def analyze_resume_and_match(resume_text: str, jd_text: str) -> Dict[str, Any]:
+    """
+    Analyse the resume and match it against the JD with a single LLM call.
+    Takes the raw JD text (not parsed jd_info) so it can run in parallel
+    with the JD analysis.
+
+    Returns { "resume_info": {...}, "match_report": {...} }.
+    Blank resume or JD text returns the empty templates without an LLM call.
+    """
+    if is_blank_input(resume_text) or is_blank_input(jd_text):
+        return {
+            "resume_info": deepcopy(EMPTY_RESUME_INFO),
+            "match_report": deepcopy(EMPTY_MATCH_REPORT),
+        }
+
     user_prompt = f"""
-JD INFO:
-{jd_info}
+RESUME TEXT:
+\"\"\"{resume_text}\"\"\"
 
-RESUME INFO:
-{resume_info}
+JOB DESCRIPTION:
+\"\"\"{jd_text}\"\"\"
 """
-    return call_gemini_json(SYSTEM_PROMPT_RESUME_MATCH, user_prompt)
+    result = call_gemini_json(SYSTEM_PROMPT_RESUME_AND_MATCH, user_prompt)
+    return {
+        "resume_info": result.get("resume_info") or {},
+        "match_report": result.get("match_report") or {},
+    }